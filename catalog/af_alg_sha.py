@@ -0,0 +1,78 @@
+"""SHA-256 through the Linux kernel crypto API (AF_ALG).
+
+The kernel hashes with its fastest sha256 driver (SHA-NI on x86, the crypto
+extensions on ARM64). Files are memory-mapped and handed to the socket in
+large slices; the kernel pins the mapped pages instead of Python copying
+them. Only used once :func:`available` has confirmed the socket works and
+agrees with hashlib, so other platforms and locked-down kernels fall back
+to hashlib transparently.
+"""
+from __future__ import annotations
+import hashlib
+import mmap
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .util import is_local_path, open_for_hashing
+
+# Below this the socket setup costs more than the kernel hash saves
+AF_ALG_MIN_BYTES = 1024 * 1024
+
+_SEND_BYTES = 4 * 1024 * 1024
+_available: Optional[bool] = None
+_available_lock = threading.Lock()
+
+
+def _digest_view(view: memoryview) -> bytes:
+    with socket.socket(socket.AF_ALG, socket.SOCK_SEQPACKET, 0) as alg:
+        alg.bind(("hash", "sha256"))
+        op, _ = alg.accept()
+        with op:
+            for off in range(0, len(view), _SEND_BYTES):
+                with view[off:off + _SEND_BYTES] as piece:
+                    sent = 0
+                    while sent < len(piece):
+                        with piece[sent:] as rest:
+                            # MSG_MORE keeps the hash open; recv() finalizes it
+                            sent += op.sendmsg([rest], [], socket.MSG_MORE)
+            return op.recv(32)
+
+
+def _self_check() -> bool:
+    if not hasattr(socket, "AF_ALG"):
+        return False
+    sample = bytes(range(256)) * 4096
+    try:
+        with memoryview(sample) as view:
+            return _digest_view(view) == hashlib.sha256(sample).digest()
+    except OSError:
+        return False
+
+
+def available() -> bool:
+    """Return True when kernel SHA-256 works here; probed once per process."""
+    global _available
+    if _available is None:
+        with _available_lock:
+            if _available is None:
+                _available = _self_check()
+    return _available
+
+
+def sha256_file_afalg(path: Path) -> str:
+    """Compute the SHA-256 hex digest of ``path`` in the kernel.
+
+    Callers should check :func:`available` first. Raises OSError if the file
+    cannot be read or mapped, including files on network filesystems, which
+    are never mapped (see :func:`catalog.util.is_local_path`).
+    """
+    if not is_local_path(path):
+        raise OSError(f"Not mapping network file: {path}")
+    with open_for_hashing(path) as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return _digest_view(view).hex()
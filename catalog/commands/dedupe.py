@@ -21,7 +21,9 @@ def _configure_parser(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--progressive", action="store_true", help="Progressive staged sampling (head/tail) before full SHA; persists h1/h2 in DB")
     parser.add_argument("--sample-bytes", type=int, help="Bytes to read for head/tail sampling (default: min(quick_hash_bytes, 64KiB))")
     parser.add_argument("--io-bytes-per-sec", type=int, help="Throttle file reading to this many bytes/sec (approximate)")
-    parser.add_argument("--blake3", action="store_true", help="Use BLAKE3 for full-file hashing (fast) and confirm duplicates with SHA-256")
+    hash_group = parser.add_mutually_exclusive_group()
+    hash_group.add_argument("--blake3", dest="use_blake3", action="store_const", const=True, help="Use BLAKE3 as the content hash (default for new catalogs when the blake3 package is installed)")
+    hash_group.add_argument("--sha256", dest="use_blake3", action="store_const", const=False, help="Use SHA256 as the content hash instead of BLAKE3")
     parser.add_argument("--skip-quick-hash", action="store_true", help="Skip quick hash stage")
     parser.add_argument("--skip-sha256", action="store_true", help="Skip SHA256 stage")
     parser.add_argument("--metadata-only", action="store_true", help="Use metadata-only duplicate detection (size+name) without hashing")
@@ -80,7 +82,7 @@ def run_from_args(args: argparse.Namespace) -> int:
             progressive=args.progressive,
             sample_bytes=args.sample_bytes,
             io_bytes_per_sec=args.io_bytes_per_sec,
-            use_blake3=args.blake3,
+            use_blake3=args.use_blake3,
             metadata_only=args.metadata_only,
         )
 
@@ -89,7 +91,7 @@ def run_from_args(args: argparse.Namespace) -> int:
         print("=" * 70)
         print(f"Files processed:       {stats['files_processed']:>10,}")
         print(f"Quick hashes:          {stats['quick_hash_count']:>10,}")
-        print(f"SHA256 hashes:         {stats['sha256_count']:>10,}")
+        print(f"Content hashes:        {stats['sha256_count']:>10,}")
         print(f"Files missing:         {stats['files_missing']:>10,}")
         print(f"Files with errors:     {stats['files_error']:>10,}")
         print(f"Duplicate groups:      {stats['duplicate_groups']:>10,}")
@@ -190,6 +192,7 @@ def run_from_args(args: argparse.Namespace) -> int:
             exclude_prefixes=args.exclude_prefix or [],
             dry_run=True,
             keep_strategy=keep_strategy,
+            use_blake3=args.use_blake3,
         )
 
         potential_gb = preview["potential_bytes_reclaimed"] / float(1024**3)
@@ -236,6 +239,7 @@ def run_from_args(args: argparse.Namespace) -> int:
             exclude_prefixes=args.exclude_prefix or [],
             dry_run=False,
             keep_strategy=keep_strategy,
+            use_blake3=args.use_blake3,
         )
         reclaimed_gb = result["bytes_reclaimed"] / float(1024**3)
         print("\n" + "=" * 70)
@@ -269,13 +273,15 @@ def run_from_args(args: argparse.Namespace) -> int:
             args.report_limit,
             include_prefixes=args.include_prefix or [],
             exclude_prefixes=args.exclude_prefix or [],
+            use_blake3=args.use_blake3,
+            cfg=cfg,
         )
 
         for i, group in enumerate(report, 1):
             wasted_mb = group["total_wasted"] / (1024**2)
             size_mb = group["size_bytes"] / (1024**2)
             print(f"\n#{i} - {group['count']} copies × {size_mb:.2f} MB = {wasted_mb:.2f} MB wasted")
-            print(f"    SHA256: {group['sha256'][:16]}...")
+            print(f"    {group['hash_column'].upper()}: {group['hash'][:16]}...")
             print("    Files:")
             for path_info in group["paths"]:
                 print(f"      - {path_info['path']}")
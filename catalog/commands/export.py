@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Optional, Sequence
 
 from ..config import load_config
-from ..export import main as export_main
+from ..export import export_tables
 
 
 def _configure_parser(parser: argparse.ArgumentParser) -> None:
@@ -38,8 +38,8 @@ def run_from_args(args: argparse.Namespace) -> int:
     if not db_path:
         cfg = load_config(Path(args.config))
         db_path = cfg.db.path
-    export_args = ["--db", db_path, "--out", args.out]
-    export_main(export_args)
+    export_tables(Path(db_path), Path(args.out))
+    print(f"[OK] Parquet written to {args.out}")
     return 0
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 import yaml
 
@@ -16,6 +16,7 @@ class DedupeConfig(BaseModel):
     min_duplicate_count: int = 5  # Only hash size+ext groups with this many files
     quick_hash_bytes: int = 262144  # 256 KB sampled from head/tail
     sha_chunk_bytes: int = 2 * 1024 * 1024  # 2 MB streaming chunks
+    use_blake3: Optional[bool] = None  # None: BLAKE3 unless the catalog already holds SHA256 digests
 
 class DBConfig(BaseModel):
     path: str = "data/projects.db"
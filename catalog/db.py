@@ -52,27 +52,222 @@ def connect(db_path: Path) -> sqlite3.Connection:
     con.execute("PRAGMA busy_timeout=5000;")
     return con
 
+def connect_readonly(db_path: Path) -> sqlite3.Connection:
+    """Open the catalog for reads only, e.g. the GUI's browse and stats queries.
+
+    mode=ro never takes a write lock, so readers sit alongside a running
+    scan under WAL (set persistently by :func:`connect`; a read-only handle
+    cannot change the journal mode). The page cache and memory map are
+    sized for interactive queries rather than bulk hashing.
+    """
+    con = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    con.execute("PRAGMA busy_timeout=5000;")
+    con.execute("PRAGMA temp_store=MEMORY;")
+    con.execute("PRAGMA cache_size=-65536;")  # 64 MiB
+    con.execute("PRAGMA mmap_size=268435456;")  # 256 MiB
+    return con
+
+def tune_for_bulk(con: sqlite3.Connection) -> None:
+  """Session pragmas for long hash runs that rewrite many rows in batches.
+
+  Temp candidate tables stay in memory, a larger page cache and a memory
+  map cover the hot indexes, and the WAL grows between checkpoints instead
+  of checkpointing every ~1000 pages. WAL and synchronous=NORMAL already
+  come from :func:`connect`.
+  """
+  con.execute("PRAGMA temp_store=MEMORY;")
+  con.execute("PRAGMA cache_size=-262144;")  # 256 MiB
+  con.execute("PRAGMA mmap_size=1073741824;")  # 1 GiB
+  con.execute("PRAGMA wal_autocheckpoint=10000;")
+
+# Integer mirror of files.state so hot filters compare one integer instead of
+# strings: live rows are < 8, error is 8 and missing is 9.
+STATE_CODE_SQL = (
+  "CASE {col} WHEN 'quick_hashed' THEN 2 WHEN 'sha_verified' THEN 3 WHEN 'done' THEN 4"
+  " WHEN 'error' THEN 8 WHEN 'missing' THEN 9 ELSE 1 END"
+)
+
+def _add_state_code(con: sqlite3.Connection) -> None:
+  cur = con.cursor()
+  if sqlite3.sqlite_version_info >= (3, 31, 0):
+    # Computed on read, so every existing writer of files.state stays correct
+    cur.execute(
+      "ALTER TABLE files ADD COLUMN state_code INTEGER GENERATED ALWAYS AS ("
+      + STATE_CODE_SQL.format(col="state") + ") VIRTUAL"
+    )
+    return
+  # Older SQLite has no generated columns: backfill once and keep it in sync with triggers
+  cur.execute("ALTER TABLE files ADD COLUMN state_code INTEGER")
+  cur.execute("UPDATE files SET state_code = " + STATE_CODE_SQL.format(col="state"))
+  for event in ("INSERT", "UPDATE OF state"):
+    name = "trg_files_state_code_" + event.split()[0].lower()
+    cur.execute(
+      f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON files BEGIN "
+      "UPDATE files SET state_code = " + STATE_CODE_SQL.format(col="NEW.state")
+      + " WHERE file_id = NEW.file_id; END"
+    )
+
+# Trigram index behind the explorer's substring filter. name and ext are part
+# of path_abs, and state and error_msg are matched through idx_files_state and
+# idx_files_state_code, so only path_abs is indexed: hash runs rewriting state
+# or recording errors never touch it. New rows are added per insert batch by
+# index_new_files (a per-row trigger is several times slower); updates and
+# deletes are kept in sync here.
+FTS_DDL = r"""
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+  path_abs, content='files', content_rowid='file_id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS trg_files_fts_delete AFTER DELETE ON files BEGIN
+  INSERT INTO files_fts(files_fts, rowid, path_abs) VALUES ('delete', OLD.file_id, OLD.path_abs);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_files_fts_update AFTER UPDATE OF path_abs ON files BEGIN
+  INSERT INTO files_fts(files_fts, rowid, path_abs) VALUES ('delete', OLD.file_id, OLD.path_abs);
+  INSERT INTO files_fts(rowid, path_abs) VALUES (NEW.file_id, NEW.path_abs);
+END;
+"""
+
+def has_files_fts(con: sqlite3.Connection) -> bool:
+  cur = con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='files_fts'")
+  return cur.fetchone() is not None
+
+def _files_fts_indexes_error_msg(con: sqlite3.Connection) -> bool:
+  cur = con.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='files_fts'")
+  row = cur.fetchone()
+  return row is not None and "error_msg" in (row[0] or "")
+
+def index_new_files(con: sqlite3.Connection, after_file_id: int) -> None:
+  """Add files rows with file_id above ``after_file_id`` to files_fts.
+
+  Run it in the transaction that inserted them: the update and delete
+  triggers assume every row is already indexed.
+  """
+  con.execute(
+    "INSERT INTO files_fts(rowid, path_abs) SELECT file_id, path_abs FROM files WHERE file_id > ?",
+    (after_file_id,),
+  )
+
+def _add_files_fts(con: sqlite3.Connection) -> None:
+  if sqlite3.sqlite_version_info < (3, 34, 0):
+    return  # No trigram tokenizer; the explorer keeps filtering with LIKE
+  try:
+    con.executescript(FTS_DDL)
+  except sqlite3.OperationalError:
+    return  # Built without FTS5
+  con.execute("INSERT INTO files_fts(files_fts) VALUES('rebuild')")
+
+def _hex_to_int64(value: object) -> object:
+  if not isinstance(value, str) or len(value) != 16:
+    return None
+  try:
+    n = int(value, 16)
+  except ValueError:
+    return None
+  return n - (1 << 64) if n >= (1 << 63) else n
+
+def _convert_hex_samples(con: sqlite3.Connection) -> None:
+  """One-time move of hex h1/h2 samples into the INTEGER h1_int/h2_int columns."""
+  read = con.cursor()
+  write = con.cursor()
+  read.execute("SELECT file_id, h1, h2 FROM files WHERE h_algo IS NOT NULL AND h1 IS NOT NULL")
+  while True:
+    rows = read.fetchmany(10000)
+    if not rows:
+      break
+    write.executemany(
+      "UPDATE files SET h1_int=?, h2_int=? WHERE file_id=?",
+      [(_hex_to_int64(h1), _hex_to_int64(h2), file_id) for file_id, h1, h2 in rows],
+    )
+  # Text samples are no longer read; drop them so they stop taking space
+  write.execute("UPDATE files SET h1=NULL, h2=NULL WHERE h1 IS NOT NULL OR h2 IS NOT NULL")
+
+def _backfill_blake3(con: sqlite3.Connection) -> None:
+  """One-time copy of BLAKE3 digests that only reached the sha256 column.
+
+  BLAKE3 runs used to store their digest in sha256 as well; a sha256 value
+  that equals some row's blake3 is therefore a BLAKE3 digest, and copying it
+  keeps that row in its duplicate group instead of queueing it for a re-hash.
+  """
+  con.execute(
+    """
+    UPDATE files SET blake3 = sha256
+    WHERE blake3 IS NULL AND sha256 IS NOT NULL
+      AND sha256 IN (SELECT blake3 FROM files WHERE blake3 IS NOT NULL)
+    """
+  )
+
 def migrate(con: sqlite3.Connection) -> None:
   con.executescript(DDL)
   # Schema upgrades: add columns if missing
   cur = con.cursor()
-  cur.execute("PRAGMA table_info(files)")
+  # table_xinfo also lists generated columns, which table_info hides
+  try:
+    cur.execute("PRAGMA table_xinfo(files)")
+  except sqlite3.DatabaseError:
+    cur.execute("PRAGMA table_info(files)")
   cols = {row[1] for row in cur.fetchall()}
   upgrades = []
   if 'h1' not in cols:
     upgrades.append("ALTER TABLE files ADD COLUMN h1 TEXT")
   if 'h2' not in cols:
     upgrades.append("ALTER TABLE files ADD COLUMN h2 TEXT")
+  if 'h_algo' not in cols:
+    upgrades.append("ALTER TABLE files ADD COLUMN h_algo TEXT")
+  convert_hex_samples = 'h1_int' not in cols and 'h1' in cols
+  if 'h1_int' not in cols:
+    upgrades.append("ALTER TABLE files ADD COLUMN h1_int INTEGER")
+  if 'h2_int' not in cols:
+    upgrades.append("ALTER TABLE files ADD COLUMN h2_int INTEGER")
   if 'blake3' not in cols:
     upgrades.append("ALTER TABLE files ADD COLUMN blake3 TEXT")
   for sql in upgrades:
     cur.execute(sql)
+  if convert_hex_samples:
+    _convert_hex_samples(con)
+  if 'state_code' not in cols:
+    _add_state_code(con)
+  cur.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_files_dedupe_live'")
+  had_dedupe_index = cur.fetchone() is not None
+  cur.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_files_blake3_live'")
+  if cur.fetchone() is None:
+    _backfill_blake3(con)
   # Add indexes for new columns (create if not exists)
   cur.executescript(
     """
-    CREATE INDEX IF NOT EXISTS idx_files_h1_size ON files(size_bytes, h1);
-    CREATE INDEX IF NOT EXISTS idx_files_h1_h2_size ON files(size_bytes, h1, h2);
+    DROP INDEX IF EXISTS idx_files_h1_size;
+    DROP INDEX IF EXISTS idx_files_h1_h2_size;
+    CREATE INDEX IF NOT EXISTS idx_files_h_int ON files(size_bytes, h1_int, h2_int);
     CREATE INDEX IF NOT EXISTS idx_files_blake3 ON files(blake3);
+    CREATE INDEX IF NOT EXISTS idx_files_state_code ON files(state_code, size_bytes);
+    -- Let the explorer seek name- and size-sorted pages; like the other
+    -- single-column indexes they end in the rowid, so they already order by
+    -- (name, file_id) and (size_bytes, file_id). The composite size indexes
+    -- put other columns before the rowid and would sort every size tie
+    CREATE INDEX IF NOT EXISTS idx_files_name ON files(name);
+    CREATE INDEX IF NOT EXISTS idx_files_size ON files(size_bytes);
+    -- Covers the dedupe candidate CTEs (GROUP BY size, ext over live rows)
+    DROP INDEX IF EXISTS idx_files_dedupe;
+    CREATE INDEX IF NOT EXISTS idx_files_dedupe_live ON files(size_bytes, COALESCE(ext, ''), quick_hash)
+      WHERE state_code < 8;
+    -- Serve the duplicate-group scans (GROUP BY hash over live rows) from the index alone
+    CREATE INDEX IF NOT EXISTS idx_files_sha256_live ON files(sha256, size_bytes)
+      WHERE sha256 IS NOT NULL AND state_code < 8;
+    CREATE INDEX IF NOT EXISTS idx_files_blake3_live ON files(blake3, size_bytes)
+      WHERE blake3 IS NOT NULL AND state_code < 8;
     """
   )
+  if not had_dedupe_index:
+    # Give the planner statistics so it prefers the new index over idx_files_size_ext
+    cur.execute("ANALYZE files")
+  if _files_fts_indexes_error_msg(con):
+    # Earlier catalogs also indexed error_msg, putting FTS writes on every
+    # missing/error update; rebuild over path_abs alone
+    cur.executescript(
+      """
+      DROP TRIGGER IF EXISTS trg_files_fts_delete;
+      DROP TRIGGER IF EXISTS trg_files_fts_update;
+      DROP TABLE IF EXISTS files_fts;
+      """
+    )
+  if not has_files_fts(con):
+    _add_files_fts(con)
   con.commit()
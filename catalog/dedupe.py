@@ -5,53 +5,255 @@ Duplicate detection module using two-stage hashing:
 2. Full SHA256 for cryptographic verification of potential duplicates
 """
 from __future__ import annotations
-import signal, sys
+import multiprocessing, os, queue, signal, sqlite3, sys, threading
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
+from collections import deque
+from itertools import groupby, islice
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, replace
 from .config import CatalogConfig
-from .db import connect, migrate
-from .util import quick_hash, sha256_file
+from .af_alg_sha import AF_ALG_MIN_BYTES, available as af_alg_available, sha256_file_afalg
+from .db import connect, migrate, tune_for_bulk as db_tune_for_bulk
+from .util import align_chunk_size, blake3_file, compile_path_filter, feed_file, mapped_file, new_quick_hasher, new_sha256, prewarm, quick_hash, sample_hash, sample_hash_pair, sample_tag, sha256_file
 try:
     import blake3  # type: ignore
     HAS_BLAKE3 = True
 except Exception:
     HAS_BLAKE3 = False
 
+# Bound once so the per-file hashing closures skip the attribute lookups
+_sha256 = new_sha256
+
 # Callback type aliases (kept local for loose coupling)
 ProgressCallback = Callable[[str, int, int, str], None]
 LogCallback = Callable[[str], None]
 
 
+def content_hash_column(use_blake3: Optional[bool] = None, con: Optional[sqlite3.Connection] = None) -> str:
+    """Return the files column that holds the full-content hash.
+
+    ``use_blake3=True`` selects BLAKE3 (when the package is installed) and
+    ``False`` selects SHA-256. ``None`` follows the catalog: BLAKE3 unless
+    ``con`` shows more live rows hashed into ``sha256`` than into ``blake3``,
+    so catalogs built by SHA-256 runs keep their digests and duplicate groups
+    instead of being re-hashed from scratch.
+    """
+    if use_blake3 is None:
+        use_blake3 = True
+        if con is not None:
+            sha_rows, b3_rows = con.execute(
+                """
+                SELECT (SELECT COUNT(*) FROM files WHERE sha256 IS NOT NULL AND state_code < 8),
+                       (SELECT COUNT(*) FROM files WHERE blake3 IS NOT NULL AND state_code < 8)
+                """
+            ).fetchone()
+            use_blake3 = b3_rows >= sha_rows
+    return "blake3" if use_blake3 and HAS_BLAKE3 else "sha256"
+
+
 def build_path_filter_sql(
     include_prefixes: List[str],
     exclude_prefixes: List[str],
     alias: str,
 ) -> Tuple[str, List[str]]:
     """Build a SQL WHERE fragment for include/exclude path filters."""
+    sql, params = compile_path_filter(tuple(include_prefixes), tuple(exclude_prefixes), alias)
+    return sql, list(params)
+
+class ByteRateLimiter:
+    """Global I/O rate limiter (token bucket) applied across all workers."""
+
+    def __init__(self, rate_bps: int, burst: Optional[int] = None) -> None:
+        self.rate = max(1, int(rate_bps))
+        self.capacity = int(burst or self.rate)
+        self.tokens = float(self.capacity)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int) -> None:
+        if n <= 0:
+            return
+        monotonic = time.monotonic
+        sleep = time.sleep
+        while True:
+            now = monotonic()
+            with self._lock:
+                elapsed = now - self.last
+                if elapsed > 0:
+                    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                    self.last = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                needed = n - self.tokens
+            # Sleep outside the lock to let others progress
+            to_sleep = max(0.001, needed / float(self.rate))
+            sleep(to_sleep)
+
+
+@dataclass(frozen=True)
+class HashParams:
+    """Per-run hashing settings handed to the worker functions below.
+
+    Resolved once by :func:`detect_duplicates` so the workers read plain
+    attributes instead of closure cells, and can be submitted to any executor.
+    """
+
+    quick_hash_bytes: int
+    sha_chunk_bytes: int
+    small_file_threshold: int
+    sample_bytes: int
+    io_bytes_per_sec: int
+    use_blake3: bool
+    use_af_alg: bool
+    limiter: Optional[ByteRateLimiter] = None
+    use_mmap: bool = True
+    blake3_threads: int = 0  # per-file BLAKE3 threads; 0 means one per CPU
+
+
+_MISSING_MSG = "File not found on disk"
+_WORKER_DIED_MSG = "Hash worker process exited while hashing this file"
+
+# Process pools rebuilt after a worker dies before stage 2 falls back to threads
+MAX_POOL_RESTARTS = 2
+
+# Files at or below this size are hashed many per task: their hash time is
+# dwarfed by the per-task scheduling cost, so they are grouped in SMALL_TASK_ROWS
+SMALL_BATCH_BYTES = 64 * 1024
+SMALL_TASK_ROWS = 64
+
+
+def _compute_quick_hash(row: Tuple[int, str, int], params: HashParams) -> Dict[str, Any]:
+    file_id, path_abs, size_bytes = row
+    try:
+        # quick_hash opens and fstats the file itself; a missing file surfaces
+        # as FileNotFoundError there instead of costing a separate exists()
+        limiter = params.limiter
+        qh = quick_hash(Path(path_abs), params.quick_hash_bytes, limiter.acquire if limiter else None)
+        return {"file_id": file_id, "status": "success", "quick_hash": qh}
+    except FileNotFoundError:
+        return {"file_id": file_id, "status": "missing", "error": _MISSING_MSG}
+    except Exception as e:
+        return {"file_id": file_id, "status": "error", "error": str(e)}
+
+
+def _hash_sample_tail(path: Path, k: int, size_bytes: int, limiter: Optional[ByteRateLimiter]) -> int:
+    read = min(k, max(0, size_bytes))
+    if read == 0:
+        return 0
+    digest, nread = sample_hash(path, read, size_bytes - read)
+    if limiter and nread > 0:
+        limiter.acquire(nread)
+    return digest
+
+
+def _compute_samples(
+    rowid: int, file_id: int, path_abs: str, size_bytes_val: int, params: HashParams
+) -> Tuple[int, int, Optional[int], Optional[int]]:
+    # Head and tail from one open, so files that go on to collide on h1 are
+    # not opened a second time for h2. Unreadable or vanished files keep NULL
+    # samples and drop out of the collision groups.
+    try:
+        h1, h2, nread = sample_hash_pair(Path(path_abs), params.sample_bytes, size_bytes_val)
+    except OSError:
+        return rowid, file_id, None, None
+    if params.limiter and nread > 0:
+        params.limiter.acquire(nread)
+    return rowid, file_id, h1, h2
+
+
+def _compute_h2(rowid: int, file_id: int, path_abs: str, size_bytes_val: int, params: HashParams) -> Tuple[int, int, Optional[int]]:
+    try:
+        h2 = _hash_sample_tail(Path(path_abs), params.sample_bytes, size_bytes_val, params.limiter)
+    except OSError:
+        h2 = None
+    return rowid, file_id, h2
+
+
+def _sha256_file_throttled(path: Path, chunk_size: int, bps: int) -> str:
+    hasher = _sha256()
+    # Legacy per-thread throttle; prefer global limiter when present
+    feed_file(hasher, path, chunk_size, lambda n: time.sleep(n / float(bps)))
+    return hasher.hexdigest()
+
+
+def _ignore_sigint() -> None:
+    # Worker processes leave Ctrl+C to the parent, which cancels cleanly
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _compute_sha256(row: Tuple[int, str, int, Optional[str]], params: HashParams) -> Dict[str, Any]:
+    file_id, path_abs, size_bytes, quick_hash_existing = row
+    # One stat answers both "is it there" and "how big is it now"
+    try:
+        st = os.stat(path_abs)
+    except FileNotFoundError:
+        return {"file_id": file_id, "status": "missing", "error": _MISSING_MSG}
+    except OSError as e:
+        return {"file_id": file_id, "status": "error", "error": str(e)}
+    path = Path(path_abs)
+    size_bytes = st.st_size or size_bytes
+    limiter = params.limiter
+    sha_chunk_bytes = params.sha_chunk_bytes
+    try:
+        if size_bytes < params.small_file_threshold and not quick_hash_existing:
+            # Small file fast-path with optional global throttling
+            hasher = blake3.blake3() if params.use_blake3 else _sha256()
+            # Also produce quick-hash if missing
+            n = params.quick_hash_bytes
+            qh_h = new_quick_hasher()
+            qh_h.update(str(size_bytes).encode())
+            with mapped_file(path, params.use_mmap) as view:
+                if limiter:
+                    step = min(sha_chunk_bytes, 64 * 1024)
+                    for off in range(0, len(view), step):
+                        limiter.acquire(min(step, len(view) - off))
+                hasher.update(view)
+                # Quick-hash head and tail come straight from the mapping
+                if n > 0 and len(view) > 0:
+                    with view[:n] as head:
+                        qh_h.update(head)
+                    if size_bytes > n:
+                        with view[-n:] as tail:
+                            qh_h.update(tail)
+            digest_key = "blake3" if params.use_blake3 else "sha256"
+            return {"file_id": file_id, "status": "success", digest_key: hasher.hexdigest(), "quick_hash": qh_h.hexdigest()}
+        if params.use_blake3:
+            # BLAKE3 is the content hash; no SHA-256 pass follows it
+            if limiter is None:
+                b3_hash = blake3_file(path, sha_chunk_bytes, params.use_mmap, params.blake3_threads)
+            else:
+                b3_hasher = blake3.blake3()
+                feed_file(b3_hasher, path, sha_chunk_bytes, limiter.acquire, use_mmap=params.use_mmap)
+                b3_hash = b3_hasher.hexdigest()
+            return {"file_id": file_id, "status": "success", "blake3": b3_hash}
+        if limiter:
+            hasher = _sha256()
+            feed_file(hasher, path, sha_chunk_bytes, limiter.acquire, use_mmap=params.use_mmap)
+            sha = hasher.hexdigest()
+        elif params.io_bytes_per_sec > 0:
+            sha = _sha256_file_throttled(path, sha_chunk_bytes, params.io_bytes_per_sec)
+        elif params.use_af_alg and params.use_mmap and size_bytes >= AF_ALG_MIN_BYTES:
+            try:
+                sha = sha256_file_afalg(path)
+            except OSError:
+                sha = sha256_file(path, sha_chunk_bytes, params.use_mmap)
+        else:
+            sha = sha256_file(path, sha_chunk_bytes, params.use_mmap)
+        return {"file_id": file_id, "status": "success", "sha256": sha}
+    except FileNotFoundError:
+        return {"file_id": file_id, "status": "missing", "error": _MISSING_MSG}
+    except Exception as e:
+        return {"file_id": file_id, "status": "error", "error": str(e)}
+
+
+def _compute_sha256_batch(rows: List[Tuple[int, str, int, Optional[str]]], params: HashParams) -> List[Dict[str, Any]]:
+    return [_compute_sha256(row, params) for row in rows]
+
 
-    clauses: List[str] = []
-    params: List[str] = []
-
-    if include_prefixes:
-        ors = []
-        for prefix in include_prefixes:
-            ors.append(f"{alias}.path_abs LIKE ?")
-            params.append(prefix.rstrip('\\/') + '%')
-        clauses.append('(' + ' OR '.join(ors) + ')')
-
-    if exclude_prefixes:
-        ors = []
-        for prefix in exclude_prefixes:
-            ors.append(f"{alias}.path_abs LIKE ?")
-            params.append(prefix.rstrip('\\/') + '%')
-        clauses.append('NOT (' + ' OR '.join(ors) + ')')
-
-    if clauses:
-        return ' AND ' + ' AND '.join(clauses) + ' ', params
-    return '', []
 def detect_duplicates(
     cfg: CatalogConfig,
     progress_cb: Optional[ProgressCallback] = None,
@@ -65,8 +267,9 @@ def detect_duplicates(
     progressive: bool = False,
     sample_bytes: Optional[int] = None,
     io_bytes_per_sec: Optional[int] = None,
-    use_blake3: bool = False,
+    use_blake3: Optional[bool] = None,
     metadata_only: bool = False,
+    tune_for_bulk: bool = True,
 ) -> Dict[str, Any]:
     """
     Run duplicate detection on files in the database.
@@ -76,7 +279,7 @@ def detect_duplicates(
     - files_missing: Number of files not found on disk
     - files_error: Number of files with hashing errors
     - quick_hash_count: Files with quick hash computed
-    - sha256_count: Files with SHA256 computed
+    - sha256_count: Files with a full-content hash (BLAKE3 or SHA256) computed
     - duplicate_groups: Number of duplicate file groups found
     - duplicate_files: Total number of duplicate files
     """
@@ -106,6 +309,8 @@ def detect_duplicates(
     sha_chunk_bytes = cfg.dedupe.sha_chunk_bytes
     if sample_bytes is None:
         sample_bytes = min(cfg.dedupe.quick_hash_bytes, 64 * 1024)
+    if use_blake3 is None:
+        use_blake3 = cfg.dedupe.use_blake3
 
     # Network-friendly mode reduces read sizes and concurrency bursts
     if network_friendly:
@@ -115,42 +320,18 @@ def detect_duplicates(
             workers = min(workers, 2)
         # Also cap sampling size to keep reads small
         sample_bytes = min(sample_bytes or 64 * 1024, 64 * 1024)
+    sha_chunk_bytes = align_chunk_size(sha_chunk_bytes)
 
     # Global I/O rate limiter (token bucket) applied across all workers
-    from threading import Lock
-    class ByteRateLimiter:
-        def __init__(self, rate_bps: int, burst: Optional[int] = None) -> None:
-            self.rate = max(1, int(rate_bps))
-            self.capacity = int(burst or self.rate)
-            self.tokens = float(self.capacity)
-            self.last = time.monotonic()
-            self._lock = Lock()
-
-        def acquire(self, n: int) -> None:
-            if n <= 0:
-                return
-            while True:
-                now = time.monotonic()
-                with self._lock:
-                    elapsed = now - self.last
-                    if elapsed > 0:
-                        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
-                        self.last = now
-                    if self.tokens >= n:
-                        self.tokens -= n
-                        return
-                    needed = n - self.tokens
-                # Sleep outside the lock to let others progress
-                to_sleep = max(0.001, needed / float(self.rate))
-                time.sleep(to_sleep)
-
     limiter: Optional[ByteRateLimiter] = None
     if io_bytes_per_sec and io_bytes_per_sec > 0:
         limiter = ByteRateLimiter(io_bytes_per_sec)
 
-    # Build optional path filters
+    # Build optional path filters once; every stage below reuses the same
+    # clause so each candidate query keeps one SQL text across runs
     include_prefixes = include_prefixes or []
     exclude_prefixes = exclude_prefixes or []
+    filt_sql, filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
 
     emit_progress("start", 0, 0, "Initializing duplicate detection...")
     mode_label = "metadata-only" if metadata_only else "hash"
@@ -195,12 +376,31 @@ def detect_duplicates(
         except Exception:
             pass
         migrate(con)
+        if tune_for_bulk:
+            db_tune_for_bulk(con)
         cur = con.cursor()
 
+        hash_col = content_hash_column(use_blake3, con)
+        use_blake3 = hash_col == "blake3"
+        params = HashParams(
+            quick_hash_bytes=int(quick_hash_bytes),
+            sha_chunk_bytes=sha_chunk_bytes,
+            small_file_threshold=small_file_threshold,
+            sample_bytes=sample_bytes or 32768,
+            io_bytes_per_sec=io_bytes_per_sec or 0,
+            use_blake3=use_blake3,
+            # Kernel SHA-256 (Linux AF_ALG) for large files when nothing throttles I/O
+            use_af_alg=not use_blake3 and not (io_bytes_per_sec and io_bytes_per_sec > 0) and af_alg_available(),
+            limiter=limiter,
+            # Network-friendly runs always stream; mmap is also skipped for
+            # any file on a network filesystem (see util.is_local_path)
+            use_mmap=not network_friendly,
+        )
+
         # High-level counts
         def compute_scope_counts() -> Tuple[int, int, int, int]:
             cur.execute(
-                "SELECT COUNT(*) FROM files WHERE state NOT IN ('error', 'missing')"
+                "SELECT COUNT(*) FROM files WHERE state_code < 8"
             )
             total_active = cur.fetchone()[0]
             cur.execute(
@@ -209,7 +409,7 @@ def detect_duplicates(
                 FROM (
                     SELECT COUNT(*) AS cnt
                     FROM files
-                    WHERE state NOT IN ('error', 'missing')
+                    WHERE state_code < 8
                       AND size_bytes >= ?
                     GROUP BY size_bytes, COALESCE(ext, '')
                     HAVING COUNT(*) >= ?
@@ -231,13 +431,12 @@ def detect_duplicates(
 
         if metadata_only:
             emit_log("[META] Running metadata-only duplicate scan (size + basename)")
-            filt_sql, filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
             cur.execute(
                 """
                 WITH dup_meta AS (
                     SELECT size_bytes, LOWER(name) AS name_key, COALESCE(ext, '') AS ext_key
                     FROM files f
-                    WHERE state NOT IN ('error', 'missing')
+                    WHERE state_code < 8
                       AND size_bytes >= ?
                     """ + filt_sql + """
                     GROUP BY size_bytes, LOWER(name), COALESCE(ext, '')
@@ -249,7 +448,7 @@ def detect_duplicates(
                   ON f.size_bytes = dm.size_bytes
                  AND LOWER(f.name) = dm.name_key
                  AND COALESCE(f.ext, '') = dm.ext_key
-                WHERE f.state NOT IN ('error', 'missing')
+                WHERE f.state_code < 8
                 ORDER BY f.size_bytes DESC, LOWER(f.name)
                 """,
                 (min_file_size, *filt_params, min_duplicate_count),
@@ -300,14 +499,13 @@ def detect_duplicates(
             emit_progress("quick_hash", 0, 0, "Finding candidates for quick hashing...")
 
             cur.execute("DROP TABLE IF EXISTS qh_candidates;")
-            filt_sql, filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
             qh_sql = (
                 """
                 CREATE TEMP TABLE qh_candidates AS
                 WITH dup_candidates AS (
                     SELECT size_bytes, COALESCE(ext, '') AS ext
                     FROM files
-                    WHERE state NOT IN ('error', 'missing')
+                    WHERE state_code < 8
                       AND size_bytes >= ?
                     GROUP BY size_bytes, COALESCE(ext, '')
                     HAVING COUNT(*) >= ?
@@ -318,7 +516,7 @@ def detect_duplicates(
                   ON f.size_bytes = dc.size_bytes
                  AND COALESCE(f.ext, '') = dc.ext
                                 WHERE f.quick_hash IS NULL
-                                    AND f.state NOT IN ('error', 'missing')
+                                    AND f.state_code < 8
                                     AND f.size_bytes >= ?
                 """
                 + filt_sql +
@@ -334,132 +532,151 @@ def detect_duplicates(
                 "quick_hash", 0, total_candidates, f"Processing {total_candidates:,} files"
             )
 
-            def compute_quick_hash(row: Tuple[int, str, int]) -> Dict[str, Any]:
-                file_id, path_abs, size_bytes = row
-                path = Path(path_abs)
-                if not path.exists():
-                    return {"file_id": file_id, "status": "missing", "error": "File not found on disk"}
-                try:
-                    if limiter is None:
-                        qh = quick_hash(path, quick_hash_bytes)
-                    else:
-                        # Throttled quick-hash: read head and tail with global limiter
-                        import hashlib
-                        try:
-                            from .util import xxhash  # type: ignore
-                        except Exception:
-                            xxhash = None  # type: ignore
-                        size = path.stat().st_size
-                        n = int(quick_hash_bytes)
-                        h = xxhash.xxh64() if xxhash else hashlib.sha1()
-                        h.update(str(size).encode())
-                        with path.open('rb', buffering=1024*64) as f:
-                            head = f.read(n)
-                            if head:
-                                limiter.acquire(len(head))
-                                h.update(head)
-                            if size > n:
-                                try:
-                                    f.seek(max(0, size - n))
-                                except OSError:
-                                    pass
-                                tail = f.read(n)
-                                if tail:
-                                    limiter.acquire(len(tail))
-                                    h.update(tail)
-                        qh = h.hexdigest()
-                    return {"file_id": file_id, "status": "success", "quick_hash": qh}
-                except Exception as e:
-                    return {"file_id": file_id, "status": "error", "error": str(e)}
-
             processed = 0
             batch_updates: List[Tuple[str, str, int]] = []
-            batch_size_qh = 500
+            missing_rows: List[Tuple[str, int]] = []
+            error_rows: List[Tuple[str, int]] = []
+            batch_size_qh = 5000
             start_time = time.time()
             last_log_time = start_time
             PAGE = 10_000
-            last_rowid = 0
-
-            with ThreadPoolExecutor(max_workers=workers) as ex:
-                while not cancelled["flag"]:
-                    cur.execute(
-                        "SELECT rowid, file_id, path_abs, size_bytes FROM qh_candidates WHERE rowid > ? ORDER BY rowid LIMIT ?",
-                        (last_rowid, PAGE),
-                    )
-                    page = cur.fetchall()
-                    if not page:
-                        break
-                    futures = {
-                        ex.submit(compute_quick_hash, (fid, pth, sz)): rowid
-                        for rowid, fid, pth, sz in page
-                    }
-                    last_rowid = page[-1][0]
-                    for fut in as_completed(list(futures.keys())):
-                        result = fut.result()
-                        processed += 1
-                        if result["status"] == "success":
-                            batch_updates.append(
-                                (result["quick_hash"], "quick_hashed", result["file_id"])
-                            )
-                            stats["quick_hash_count"] += 1
-                        elif result["status"] == "missing":
-                            cur.execute(
-                                "UPDATE files SET state='missing', error_code='not_found', error_msg=? WHERE file_id=?",
-                                (result["error"], result["file_id"]),
-                            )
-                            stats["files_missing"] += 1
-                        else:
-                            cur.execute(
-                                "UPDATE files SET state='error', error_code='hash_failed', error_msg=? WHERE file_id=?",
-                                (result["error"], result["file_id"]),
-                            )
-                            stats["files_error"] += 1
-
-                        if len(batch_updates) >= batch_size_qh:
-                            cur.executemany(
-                                "UPDATE files SET quick_hash=?, state=? WHERE file_id=?",
-                                batch_updates,
-                            )
-                            con.commit()
-                            batch_updates = []
-
-                        if processed % 100 == 0 or processed == total_candidates:
-                            elapsed = time.time() - start_time
-                            rate = processed / elapsed if elapsed > 0 else 0
-                            remaining = (total_candidates - processed) / rate if rate > 0 else 0
-                            eta_mins = remaining / 60
-                            emit_progress(
-                                "quick_hash",
-                                processed,
-                                total_candidates,
-                                f"Hashed {processed:,}/{total_candidates:,} files ({rate:.1f}/s, ETA {eta_mins:.1f}m)",
-                            )
-                            now = time.time()
-                            if now - last_log_time >= 30 or processed == total_candidates:
-                                emit_log(
-                                    f"[QUICK] {processed:,}/{total_candidates:,} processed ("
-                                    f"{stats['quick_hash_count']:,} ok, {stats['files_missing']:,} missing, {stats['files_error']:,} errors) "
-                                    f"| {rate:.1f} files/sec | ETA {eta_mins:.1f} min"
-                                )
-                                last_log_time = now
-
-                        if cancelled["flag"]:
-                            emit_log("[CANCEL] Stopping quick-hash (Ctrl+C)")
-                            break
 
+            def flush_quick_hash_updates() -> None:
+                # Hashes, missing and error rows go out together in one transaction
                 if batch_updates:
                     cur.executemany(
                         "UPDATE files SET quick_hash=?, state=? WHERE file_id=?",
                         batch_updates,
                     )
-                    con.commit()
+                if missing_rows:
+                    cur.executemany(
+                        "UPDATE files SET state='missing', error_code='not_found', error_msg=? WHERE file_id=?",
+                        missing_rows,
+                    )
+                if error_rows:
+                    cur.executemany(
+                        "UPDATE files SET state='error', error_code='hash_failed', error_msg=? WHERE file_id=?",
+                        error_rows,
+                    )
+                con.commit()
+                batch_updates.clear()
+                missing_rows.clear()
+                error_rows.clear()
+
+            def handle_quick_hash_result(result: Dict[str, Any]) -> None:
+                nonlocal processed, last_log_time
+                processed += 1
+                if result["status"] == "success":
+                    batch_updates.append(
+                        (result["quick_hash"], "quick_hashed", result["file_id"])
+                    )
+                    stats["quick_hash_count"] += 1
+                elif result["status"] == "missing":
+                    missing_rows.append((result["error"], result["file_id"]))
+                    stats["files_missing"] += 1
+                else:
+                    error_rows.append((result["error"], result["file_id"]))
+                    stats["files_error"] += 1
+
+                if len(batch_updates) + len(missing_rows) + len(error_rows) >= batch_size_qh:
+                    flush_quick_hash_updates()
+
+                if processed % 100 == 0 or processed == total_candidates:
+                    elapsed = time.time() - start_time
+                    rate = processed / elapsed if elapsed > 0 else 0
+                    remaining = (total_candidates - processed) / rate if rate > 0 else 0
+                    eta_mins = remaining / 60
+                    emit_progress(
+                        "quick_hash",
+                        processed,
+                        total_candidates,
+                        f"Hashed {processed:,}/{total_candidates:,} files ({rate:.1f}/s, ETA {eta_mins:.1f}m)",
+                    )
+                    now = time.time()
+                    if now - last_log_time >= 30 or processed == total_candidates:
+                        emit_log(
+                            f"[QUICK] {processed:,}/{total_candidates:,} processed ("
+                            f"{stats['quick_hash_count']:,} ok, {stats['files_missing']:,} missing, {stats['files_error']:,} errors) "
+                            f"| {rate:.1f} files/sec | ETA {eta_mins:.1f} min"
+                        )
+                        last_log_time = now
+
+            # One set of worker threads for the whole stage, fed through bounded
+            # queues: the main thread keeps reading pages and writing batches while
+            # workers hash, and never holds more than max_in_flight paths at once.
+            # All SQLite access stays on the main thread.
+            in_q: "queue.Queue[Optional[Tuple[int, str, int]]]" = queue.Queue(maxsize=2 * workers)
+            out_q: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+            max_in_flight = 4 * workers
+            in_flight = 0
+
+            def quick_hash_worker() -> None:
+                while True:
+                    item = in_q.get()
+                    if item is None:
+                        return
+                    try:
+                        out_q.put(_compute_quick_hash(item, params))
+                    except Exception as e:
+                        out_q.put({"file_id": item[0], "status": "error", "error": str(e)})
+
+            qh_threads = [
+                threading.Thread(target=quick_hash_worker, name=f"quick-hash-{n}", daemon=True)
+                for n in range(workers)
+            ]
+            for t in qh_threads:
+                t.start()
+            # Read one page ahead and have the kernel start fetching its
+            # head/tail ranges while the workers hash the current page.
+            # Skipped in network-friendly mode, where readahead would add
+            # unthrottled SMB traffic behind the limiter's back.
+            prewarm_pool = ThreadPoolExecutor(max_workers=2) if not network_friendly else None
+            try:
+                # One streaming SELECT on its own cursor instead of re-querying per
+                # page; writes go through ``cur`` on the same connection because
+                # the candidate tables are TEMP and invisible to other connections.
+                read_cur = con.cursor()
+                read_cur.execute("SELECT file_id, path_abs, size_bytes FROM qh_candidates ORDER BY rowid")
+                page = read_cur.fetchmany(PAGE)
+                while page and not cancelled["flag"]:
+                    next_page = read_cur.fetchmany(PAGE)
+                    if prewarm_pool is not None and next_page:
+                        prewarm_pool.submit(prewarm, [(pth, sz or 0) for _, pth, sz in next_page], quick_hash_bytes)
+                    for fid, pth, sz in page:
+                        if cancelled["flag"]:
+                            emit_log("[CANCEL] Stopping quick-hash (Ctrl+C)")
+                            break
+                        while in_flight >= max_in_flight:
+                            handle_quick_hash_result(out_q.get())
+                            in_flight -= 1
+                        in_q.put((fid, pth, sz))
+                        in_flight += 1
+                        while in_flight and not out_q.empty():
+                            handle_quick_hash_result(out_q.get())
+                            in_flight -= 1
+
+                    # One commit per page rather than per few hundred rows
+                    flush_quick_hash_updates()
+                    page = next_page
+
+                while in_flight:
+                    handle_quick_hash_result(out_q.get())
+                    in_flight -= 1
+                flush_quick_hash_updates()
+            finally:
+                if prewarm_pool is not None:
+                    prewarm_pool.shutdown(wait=False, cancel_futures=True)
+                for _ in qh_threads:
+                    in_q.put(None)
+                for t in qh_threads:
+                    t.join()
             emit_log(
                 f"[STAGE 1] Complete: {stats['quick_hash_count']:,} files quick-hashed"
             )
 
         # Stage 2: BLAKE3/SHA256 for potential duplicates
         if enable_sha256:
-            hash_name = "BLAKE3" if (use_blake3 and HAS_BLAKE3) else "SHA256"
+            hash_name = "BLAKE3" if use_blake3 else "SHA256"
             emit_log(f"[STAGE 2] {hash_name} verification")
             emit_progress("hash", 0, 0, "Finding potential duplicates...")
 
@@ -467,8 +684,9 @@ def detect_duplicates(
                 # Progressive staged sampling: head hash (h1), then tail hash (h2), then full sha for remaining collisions
                 emit_log("[PROG] Progressive mode enabled")
                 cur.execute("DROP TABLE IF EXISTS prog_candidates;")
-                filt_sql, filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
-                # Bring over persisted h1/h2 to avoid recomputation when unchanged
+                # Bring over persisted h1/h2 to avoid recomputation when unchanged,
+                # but only when they were sampled with the same algorithm and size
+                h_tag = sample_tag(params.sample_bytes)
                 cur.execute(
                     (
                         """
@@ -476,126 +694,78 @@ def detect_duplicates(
                         WITH dup_candidates AS (
                             SELECT size_bytes, COALESCE(ext, '') AS ext
                             FROM files
-                            WHERE state NOT IN ('error', 'missing')
+                            WHERE state_code < 8
                               AND size_bytes >= ?
                             GROUP BY size_bytes, COALESCE(ext, '')
                             HAVING COUNT(*) >= ?
                         )
                         SELECT f.file_id, f.path_abs, f.size_bytes,
-                               f.h1 AS h1, f.h2 AS h2, f.mtime_utc
+                               CASE WHEN f.h_algo = ? THEN f.h1_int END AS h1,
+                               CASE WHEN f.h_algo = ? THEN f.h2_int END AS h2,
+                               f.mtime_utc
                         FROM files f
                         INNER JOIN dup_candidates dc
                           ON f.size_bytes = dc.size_bytes
                          AND COALESCE(f.ext, '') = dc.ext
-                        WHERE f.sha256 IS NULL
-                          AND f.state NOT IN ('error', 'missing')
+                        WHERE f.""" + hash_col + """ IS NULL
+                          AND f.state_code < 8
                         """
                         + filt_sql +
                         ";"
                     ),
-                    (min_file_size, min_duplicate_count, *filt_params),
+                    (min_file_size, min_duplicate_count, h_tag, h_tag, *filt_params),
                 )
 
-                def _h_algo():
-                    try:
-                        from .util import xxhash  # type: ignore
-                        return 'xxhash'
-                    except Exception:
-                        return 'blake2b'
-
-                import hashlib
-
-                def hash_sample_head(path: Path, k: int) -> str:
-                    try:
-                        data = b""
-                        with path.open('rb', buffering=1024*64) as f:
-                            data = f.read(k)
-                        if limiter and len(data) > 0:
-                            limiter.acquire(len(data))
-                        if _h_algo() == 'xxhash':
-                            from .util import xxhash  # type: ignore
-                            h = xxhash.xxh64()
-                            h.update(data)
-                            return h.hexdigest()
-                        else:
-                            return hashlib.blake2b(data, digest_size=16).hexdigest()
-                    except Exception as e:
-                        raise e
-
-                def hash_sample_tail(path: Path, k: int, size_bytes: int) -> str:
-                    try:
-                        read = min(k, max(0, size_bytes))
-                        if read == 0:
-                            return ""
-                        with path.open('rb', buffering=1024*64) as f:
-                            # Seek to tail start
-                            start = max(0, size_bytes - read)
-                            f.seek(start)
-                            data = f.read(read)
-                        if limiter and len(data) > 0:
-                            limiter.acquire(len(data))
-                        if _h_algo() == 'xxhash':
-                            from .util import xxhash  # type: ignore
-                            h = xxhash.xxh64()
-                            h.update(data)
-                            return h.hexdigest()
-                        else:
-                            return hashlib.blake2b(data, digest_size=16).hexdigest()
-                    except Exception as e:
-                        raise e
-
-                # Stage 2.1: compute h1 (head hash) for all prog candidates
+                # Stage 2.1: compute h1 (head hash) and h2 (tail hash) for all prog candidates
                 cur.execute("SELECT COUNT(*) FROM prog_candidates")
                 total_prog = cur.fetchone()[0]
                 emit_log(f"[PROG] Candidates: {total_prog:,}")
-                emit_progress("sha256", 0, total_prog, "Sampling file heads (h1)...")
+                emit_progress("sha256", 0, total_prog, "Sampling file heads and tails (h1/h2)...")
 
                 PAGE = 10_000
-                last_rowid = 0
                 processed_h1 = 0
-                batch_h1_updates: List[Tuple[str, int]] = []
-
-                def compute_h1(rowid: int, file_id: int, path_abs: str) -> Tuple[int, int, str]:
-                    h1 = hash_sample_head(Path(path_abs), sample_bytes or 32768)
-                    return rowid, file_id, h1
+                batch_h1_updates: List[Tuple[Optional[int], Optional[int], int]] = []
 
                 with ThreadPoolExecutor(max_workers=workers) as ex:
+                    read_cur = con.cursor()
+                    read_cur.execute("SELECT rowid, file_id, path_abs, size_bytes FROM prog_candidates WHERE h1 IS NULL ORDER BY rowid")
                     while not cancelled["flag"]:
-                        cur.execute(
-                            "SELECT rowid, file_id, path_abs FROM prog_candidates WHERE rowid > ? AND h1 IS NULL ORDER BY rowid LIMIT ?",
-                            (last_rowid, PAGE),
-                        )
-                        page = cur.fetchall()
+                        page = read_cur.fetchmany(PAGE)
                         if not page:
                             break
                         h1_futures = [
-                            ex.submit(compute_h1, rowid, fid, pth)
-                            for rowid, fid, pth in page
+                            ex.submit(_compute_samples, rowid, fid, pth, sz, params)
+                            for rowid, fid, pth, sz in page
                         ]
-                        last_rowid = page[-1][0]
                         for fut_h1 in as_completed(h1_futures):
-                            rowid, file_id, h1 = fut_h1.result()
+                            rowid, file_id, h1, h2 = fut_h1.result()
                             processed_h1 += 1
-                            batch_h1_updates.append((h1, int(file_id)))
+                            # Keyed by rowid: prog_candidates has no file_id index
+                            batch_h1_updates.append((h1, h2, rowid))
                             if len(batch_h1_updates) >= 1000:
-                                cur.executemany("UPDATE prog_candidates SET h1=? WHERE file_id=?", batch_h1_updates)
+                                cur.executemany("UPDATE prog_candidates SET h1=?, h2=? WHERE rowid=?", batch_h1_updates)
                                 con.commit()
                                 batch_h1_updates = []
                             if processed_h1 % 200 == 0 or processed_h1 == total_prog:
-                                emit_progress("sha256", processed_h1, total_prog, "Sampling file heads (h1)...")
+                                emit_progress("sha256", processed_h1, total_prog, "Sampling file heads and tails (h1/h2)...")
                             if cancelled["flag"]:
                                 break
                 if batch_h1_updates:
-                    cur.executemany("UPDATE prog_candidates SET h1=? WHERE file_id=?", batch_h1_updates)
+                    cur.executemany("UPDATE prog_candidates SET h1=?, h2=? WHERE rowid=?", batch_h1_updates)
                     con.commit()
 
-                # Stage 2.2: compute h2 (tail hash) only for collisions on (size, h1)
+                # Stage 2.2: compute h2 (tail hash) for collisions on (size, h1) that
+                # still lack one (h1 reused from a previous run without its h2)
                 emit_progress("sha256", 0, 0, "Sampling file tails (h2) for collisions...")
+                # Built once h1 is filled in: both collision passes below group on a
+                # prefix of this index and walk it in order instead of sorting into
+                # a temp B-tree; the h2 writes that follow only touch collisions.
+                cur.execute("CREATE INDEX IF NOT EXISTS temp.idx_prog_size_h1_h2 ON prog_candidates(size_bytes, h1, h2)")
                 cur.execute("DROP TABLE IF EXISTS h1_collisions;")
                 cur.execute(
                     """
                     CREATE TEMP TABLE h1_collisions AS
-                    SELECT p.file_id, p.path_abs, p.size_bytes
+                    SELECT p.rowid AS prog_rowid, p.file_id, p.path_abs, p.size_bytes
                     FROM prog_candidates p
                     JOIN (
                         SELECT size_bytes, h1
@@ -605,40 +775,33 @@ def detect_duplicates(
                         HAVING COUNT(*) > 1
                     ) g
                     ON p.size_bytes = g.size_bytes AND p.h1 = g.h1
+                    WHERE p.h2 IS NULL
                     """
                 )
                 cur.execute("SELECT COUNT(*) FROM h1_collisions")
                 total_h1_col = cur.fetchone()[0]
-                emit_log(f"[PROG] H1 collision candidates: {total_h1_col:,}")
+                emit_log(f"[PROG] H1 collision candidates needing h2: {total_h1_col:,}")
                 PAGE = 10_000
-                last_rowid = 0
                 processed_h2 = 0
-                batch_h2_updates: List[Tuple[str, int]] = []
-
-                def compute_h2(rowid: int, file_id: int, path_abs: str, size_bytes_val: int) -> Tuple[int, int, str]:
-                    h2 = hash_sample_tail(Path(path_abs), sample_bytes or 32768, size_bytes_val)
-                    return rowid, file_id, h2
+                batch_h2_updates: List[Tuple[Optional[int], int]] = []
 
                 with ThreadPoolExecutor(max_workers=workers) as ex:
+                    read_cur = con.cursor()
+                    read_cur.execute("SELECT prog_rowid, file_id, path_abs, size_bytes FROM h1_collisions ORDER BY rowid")
                     while not cancelled["flag"]:
-                        cur.execute(
-                            "SELECT rowid, file_id, path_abs, size_bytes FROM h1_collisions WHERE rowid > ? ORDER BY rowid LIMIT ?",
-                            (last_rowid, PAGE),
-                        )
-                        page = cur.fetchall()
+                        page = read_cur.fetchmany(PAGE)
                         if not page:
                             break
                         h2_futures = [
-                            ex.submit(compute_h2, rowid, fid, pth, sz)
+                            ex.submit(_compute_h2, rowid, fid, pth, sz, params)
                             for rowid, fid, pth, sz in page
                         ]
-                        last_rowid = page[-1][0]
                         for fut_h2 in as_completed(h2_futures):
                             rowid, file_id, h2 = fut_h2.result()
                             processed_h2 += 1
-                            batch_h2_updates.append((h2, int(file_id)))
+                            batch_h2_updates.append((h2, rowid))
                             if len(batch_h2_updates) >= 1000:
-                                cur.executemany("UPDATE prog_candidates SET h2=? WHERE file_id=?", batch_h2_updates)
+                                cur.executemany("UPDATE prog_candidates SET h2=? WHERE rowid=?", batch_h2_updates)
                                 con.commit()
                                 batch_h2_updates = []
                             if processed_h2 % 200 == 0 or processed_h2 == total_h1_col:
@@ -646,16 +809,35 @@ def detect_duplicates(
                             if cancelled["flag"]:
                                 break
                 if batch_h2_updates:
-                    cur.executemany("UPDATE prog_candidates SET h2=? WHERE file_id=?", batch_h2_updates)
+                    cur.executemany("UPDATE prog_candidates SET h2=? WHERE rowid=?", batch_h2_updates)
                     con.commit()
 
-                # Persist h1/h2 to files for reuse in future runs
-                cur.execute(
-                    "UPDATE files SET h1=(SELECT h1 FROM prog_candidates WHERE prog_candidates.file_id=files.file_id) WHERE file_id IN (SELECT file_id FROM prog_candidates WHERE h1 IS NOT NULL)"
-                )
-                cur.execute(
-                    "UPDATE files SET h2=(SELECT h2 FROM prog_candidates WHERE prog_candidates.file_id=files.file_id) WHERE file_id IN (SELECT file_id FROM prog_candidates WHERE h2 IS NOT NULL)"
-                )
+                # Persist h1/h2 to files for reuse in future runs. Both columns are
+                # written together with the tag so a stale h2 from another
+                # algorithm is never left behind under the new tag.
+                if sqlite3.sqlite_version_info >= (3, 33, 0):
+                    # One join instead of two correlated lookups per row
+                    cur.execute(
+                        """
+                        UPDATE files SET h1_int = p.h1, h2_int = p.h2, h_algo = ?
+                        FROM prog_candidates p
+                        WHERE files.file_id = p.file_id AND p.h1 IS NOT NULL
+                        """,
+                        (h_tag,),
+                    )
+                else:
+                    # Pre-3.33 SQLite has no UPDATE ... FROM; index the lookups instead
+                    cur.execute("CREATE INDEX IF NOT EXISTS temp.idx_prog_fid ON prog_candidates(file_id)")
+                    cur.execute(
+                        """
+                        UPDATE files SET
+                            h1_int=(SELECT h1 FROM prog_candidates WHERE prog_candidates.file_id=files.file_id),
+                            h2_int=(SELECT h2 FROM prog_candidates WHERE prog_candidates.file_id=files.file_id),
+                            h_algo=?
+                        WHERE file_id IN (SELECT file_id FROM prog_candidates WHERE h1 IS NOT NULL)
+                        """,
+                        (h_tag,),
+                    )
                 con.commit()
 
                 # Stage 2.3: derive sha_candidates from (size, h1, h2) groups with count > 1
@@ -683,14 +865,13 @@ def detect_duplicates(
             else:
                 # Original SHA candidates path (quick-hash centric)
                 cur.execute("DROP TABLE IF EXISTS sha_candidates;")
-                filt_sql, filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
                 sha_sql = (
                     """
                     CREATE TEMP TABLE sha_candidates AS
                     WITH dup_candidates AS (
                         SELECT size_bytes, COALESCE(ext, '') AS ext
                         FROM files
-                        WHERE state NOT IN ('error', 'missing')
+                        WHERE state_code < 8
                           AND size_bytes >= ?
                         GROUP BY size_bytes, COALESCE(ext, '')
                         HAVING COUNT(*) >= ?
@@ -707,8 +888,8 @@ def detect_duplicates(
                     INNER JOIN dup_candidates dc
                       ON f.size_bytes = dc.size_bytes
                      AND COALESCE(f.ext, '') = dc.ext
-                    WHERE f.sha256 IS NULL
-                      AND f.state NOT IN ('error', 'missing')
+                    WHERE f.""" + hash_col + """ IS NULL
+                      AND f.state_code < 8
                     """
                 )
                 if network_friendly:
@@ -731,190 +912,213 @@ def detect_duplicates(
                     "hash", 0, total_sha, f"Verifying {total_sha:,} potential duplicates"
                 )
 
-            def _sha256_file_throttled(path: Path, chunk_size: int, bps: int) -> str:
-                import hashlib
-                hasher = hashlib.sha256()
-                with path.open('rb', buffering=1024*64) as f:
-                    while True:
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        hasher.update(chunk)
-                        # Legacy per-thread throttle; prefer global limiter when present
-                        time.sleep(len(chunk) / float(bps))
-                return hasher.hexdigest()
-
-            def compute_sha256(row: Tuple[int, str, int, Optional[str]]) -> Dict[str, Any]:
-                file_id, path_abs, size_bytes, quick_hash_existing = row
-                path = Path(path_abs)
-                if not path.exists():
-                    return {"file_id": file_id, "status": "missing", "error": "File not found on disk"}
-                try:
-                    if size_bytes < small_file_threshold and not quick_hash_existing:
-                        # Small file fast-path with optional global throttling
-                        import hashlib
-                        hasher = hashlib.sha256()
-                        # Also produce quick-hash if missing
-                        try:
-                            from .util import xxhash
-                        except Exception:
-                            xxhash = None  # type: ignore
-                        n = int(quick_hash_bytes)
-                        qh_h = xxhash.xxh64() if xxhash else hashlib.sha1()
-                        qh_h.update(str(size_bytes).encode())
-                        head_rem = n
-                        tail_buf = bytearray()
-                        with path.open('rb', buffering=1024*64) as f:
-                            while True:
-                                chunk = f.read(min(sha_chunk_bytes, 64 * 1024))
-                                if not chunk:
-                                    break
-                                if limiter:
-                                    limiter.acquire(len(chunk))
-                                hasher.update(chunk)
-                                # Capture head bytes for quick-hash
-                                if head_rem > 0:
-                                    take = min(head_rem, len(chunk))
-                                    qh_h.update(chunk[:take])
-                                    head_rem -= take
-                                # Maintain tail buffer up to n bytes
-                                if n > 0:
-                                    if len(tail_buf) >= n:
-                                        # ensure we don't grow unbounded
-                                        excess = len(tail_buf) + len(chunk) - n
-                                        if excess > 0:
-                                            tail_buf = tail_buf[excess:]
-                                    tail_buf.extend(chunk)
-                                    if len(tail_buf) > n:
-                                        tail_buf = tail_buf[-n:]
-                        if n > 0 and len(tail_buf) > 0 and size_bytes > n:
-                            qh_h.update(bytes(tail_buf[-n:]))
-                        return {"file_id": file_id, "status": "success", "sha256": hasher.hexdigest(), "quick_hash": qh_h.hexdigest()}
-                    else:
-                        if use_blake3 and HAS_BLAKE3:
-                            # Use BLAKE3 only - much faster than SHA256
-                            b3_hasher = blake3.blake3()
-                            with path.open('rb', buffering=1024*64) as f:
-                                while True:
-                                    chunk = f.read(sha_chunk_bytes)
-                                    if not chunk:
-                                        break
-                                    b3_hasher.update(chunk)
-                                    if limiter:
-                                        limiter.acquire(len(chunk))
-                            b3_hash = b3_hasher.hexdigest()
-                            return {
-                                "file_id": file_id,
-                                "status": "success",
-                                "sha256": b3_hash,  # Store BLAKE3 in sha256 column for compatibility
-                                "blake3": b3_hash,
-                            }
-                        else:
-                            if limiter:
-                                import hashlib
-                                hasher = hashlib.sha256()
-                                with path.open('rb', buffering=1024*64) as f:
-                                    while True:
-                                        chunk = f.read(sha_chunk_bytes)
-                                        if not chunk:
-                                            break
-                                        hasher.update(chunk)
-                                        limiter.acquire(len(chunk))
-                                sha = hasher.hexdigest()
-                            else:
-                                if io_bytes_per_sec and io_bytes_per_sec > 0:
-                                    sha = _sha256_file_throttled(path, sha_chunk_bytes, io_bytes_per_sec)
-                                else:
-                                    sha = sha256_file(path, sha_chunk_bytes)
-                            return {"file_id": file_id, "status": "success", "sha256": sha}
-                except Exception as e:
-                    return {"file_id": file_id, "status": "error", "error": str(e)}
+            if params.use_af_alg:
+                emit_log("[INFO] Using kernel SHA-256 (AF_ALG) for large files")
 
             processed_sha = 0
-            batch_sha_updates: List[Tuple[Optional[str], str, Optional[str], Optional[str], int]] = []
+            # Each run writes one digest column; rows from the small-file path
+            # also carry a quick hash, so they go through a second statement
+            batch_sha_updates: List[Tuple[str, int]] = []
+            batch_sha_qh_updates: List[Tuple[str, str, int]] = []
+            sha_update_sql = f"UPDATE files SET {hash_col}=?, state='sha_verified' WHERE file_id=?"
+            sha_qh_update_sql = f"UPDATE files SET {hash_col}=?, quick_hash=?, state='sha_verified' WHERE file_id=?"
+            sha_missing_rows: List[Tuple[str, int]] = []
+            sha_error_rows: List[Tuple[str, int]] = []
             batch_size_sha = 500
             sha_start_time = time.time()
             sha_last_log_time = sha_start_time
             PAGE = 5_000
-            last_rowid = 0
 
-            with ThreadPoolExecutor(max_workers=workers) as ex:
-                while not cancelled["flag"]:
-                    cur.execute(
-                        "SELECT rowid, file_id, path_abs, size_bytes, quick_hash FROM sha_candidates WHERE rowid > ? ORDER BY rowid LIMIT ?",
-                        (last_rowid, PAGE),
+            # Unthrottled runs on Linux hash in worker processes so the per-file
+            # Python overhead scales past one core; rows travel in small batches
+            # to amortize IPC. The token-bucket limiter cannot be shared across
+            # processes, and spawning is slow on Windows/macOS, so those keep threads.
+            use_processes = params.limiter is None and sys.platform.startswith("linux")
+            if use_processes:
+                emit_log(f"[INFO] Hashing in {workers} worker processes")
+                task_rows = 32
+            else:
+                task_rows = 1
+            # Worker processes split the cores between them for BLAKE3's
+            # per-file thread pool instead of each starting one per CPU;
+            # the thread-pool path shares one process and keeps AUTO
+            process_params = replace(params, blake3_threads=max(1, (os.cpu_count() or 1) // workers))
+            task_params = process_params if use_processes else params
+
+            def new_sha_executor() -> Executor:
+                if use_processes:
+                    return ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                        initializer=_ignore_sigint,
                     )
-                    page = cur.fetchall()
-                    if not page:
-                        break
-                    futures = {
-                        ex.submit(compute_sha256, (fid, pth, sz, qh)): rowid
-                        for rowid, fid, pth, sz, qh in page
-                    }
-                    last_rowid = page[-1][0]
-                    for fut in as_completed(list(futures.keys())):
-                        result = fut.result()
-                        processed_sha += 1
-                        if result["status"] == "success":
-                            batch_sha_updates.append(
-                                (
-                                    result.get("sha256"),
-                                    "sha_verified",
-                                    result.get("quick_hash"),
-                                    result.get("blake3"),
-                                    result["file_id"],
-                                )
-                            )
-                            stats["sha256_count"] += 1
-                        elif result["status"] == "missing":
-                            cur.execute(
-                                "UPDATE files SET state='missing', error_code='not_found', error_msg=? WHERE file_id=?",
-                                (result["error"], result["file_id"]),
-                            )
-                            stats["files_missing"] += 1
-                        else:
-                            cur.execute(
-                                "UPDATE files SET state='error', error_code='hash_failed', error_msg=? WHERE file_id=?",
-                                (result["error"], result["file_id"]),
-                            )
-                            stats["files_error"] += 1
-
-                        if len(batch_sha_updates) >= batch_size_sha:
-                            cur.executemany(
-                                "UPDATE files SET sha256=COALESCE(?, sha256), state=?, quick_hash=COALESCE(quick_hash, ?), blake3=COALESCE(?, blake3) WHERE file_id=?",
-                                batch_sha_updates,
-                            )
-                            con.commit()
-                            batch_sha_updates = []
-
-                        if processed_sha % 50 == 0 or processed_sha == total_sha:
-                            sha_elapsed = time.time() - sha_start_time
-                            sha_rate = processed_sha / sha_elapsed if sha_elapsed > 0 else 0
-                            sha_remaining = (total_sha - processed_sha) / sha_rate if sha_rate > 0 else 0
-                            sha_eta_mins = sha_remaining / 60
-                            emit_progress(
-                                "hash",
-                                processed_sha,
-                                total_sha,
-                                f"Verified {processed_sha:,}/{total_sha:,} files ({sha_rate:.1f}/s, ETA {sha_eta_mins:.1f}m)",
-                            )
-                            now = time.time()
-                            if now - sha_last_log_time >= 30 or processed_sha == total_sha:
-                                emit_log(
-                                    f"[{hash_name}] {processed_sha:,}/{total_sha:,} processed | {sha_rate:.1f} files/sec | ETA {sha_eta_mins:.1f} min"
-                                )
-                                sha_last_log_time = now
-
-                        if cancelled["flag"]:
-                            emit_log(f"[CANCEL] Stopping {hash_name} (Ctrl+C)")
-                            break
+                return ThreadPoolExecutor(max_workers=workers)
 
+            def flush_sha_updates() -> None:
+                # Digests, missing and error rows share one transaction
                 if batch_sha_updates:
+                    cur.executemany(sha_update_sql, batch_sha_updates)
+                if batch_sha_qh_updates:
+                    cur.executemany(sha_qh_update_sql, batch_sha_qh_updates)
+                if sha_missing_rows:
                     cur.executemany(
-                        "UPDATE files SET sha256=COALESCE(?, sha256), state=?, quick_hash=COALESCE(quick_hash, ?), blake3=COALESCE(?, blake3) WHERE file_id=?",
-                        batch_sha_updates,
+                        "UPDATE files SET state='missing', error_code='not_found', error_msg=? WHERE file_id=?",
+                        sha_missing_rows,
                     )
-                    con.commit()
+                if sha_error_rows:
+                    cur.executemany(
+                        "UPDATE files SET state='error', error_code='hash_failed', error_msg=? WHERE file_id=?",
+                        sha_error_rows,
+                    )
+                con.commit()
+                batch_sha_updates.clear()
+                batch_sha_qh_updates.clear()
+                sha_missing_rows.clear()
+                sha_error_rows.clear()
+
+            def handle_sha_result(result: Dict[str, Any]) -> None:
+                nonlocal processed_sha
+                processed_sha += 1
+                if result["status"] == "success":
+                    qh = result.get("quick_hash")
+                    if qh is None:
+                        batch_sha_updates.append((result[hash_col], result["file_id"]))
+                    else:
+                        batch_sha_qh_updates.append((result[hash_col], qh, result["file_id"]))
+                    stats["sha256_count"] += 1
+                elif result["status"] == "missing":
+                    sha_missing_rows.append((result["error"], result["file_id"]))
+                    stats["files_missing"] += 1
+                else:
+                    sha_error_rows.append((result["error"], result["file_id"]))
+                    stats["files_error"] += 1
+
+                if len(batch_sha_updates) + len(batch_sha_qh_updates) + len(sha_missing_rows) + len(sha_error_rows) >= batch_size_sha:
+                    flush_sha_updates()
+
+            def report_sha_progress() -> None:
+                nonlocal sha_last_log_time
+                done_count = processed_sha
+                sha_elapsed = time.time() - sha_start_time
+                sha_rate = done_count / sha_elapsed if sha_elapsed > 0 else 0
+                sha_remaining = (total_sha - done_count) / sha_rate if sha_rate > 0 else 0
+                sha_eta_mins = sha_remaining / 60
+                emit_progress(
+                    "hash",
+                    done_count,
+                    total_sha,
+                    f"Verified {done_count:,}/{total_sha:,} files ({sha_rate:.1f}/s, ETA {sha_eta_mins:.1f}m)",
+                )
+                now = time.time()
+                if now - sha_last_log_time >= 30 or done_count == total_sha:
+                    emit_log(
+                        f"[{hash_name}] {done_count:,}/{total_sha:,} processed | {sha_rate:.1f} files/sec | ETA {sha_eta_mins:.1f} min"
+                    )
+                    sha_last_log_time = now
+
+            # Progress is sampled once a second off the hot loop, which then
+            # only counts and queues rows
+            sha_progress_stop = threading.Event()
+
+            def sha_progress_tick() -> None:
+                while not sha_progress_stop.wait(1.0):
+                    report_sha_progress()
+
+            sha_progress_thread = threading.Thread(target=sha_progress_tick, name="sha-progress", daemon=True)
+
+            def sha_tasks() -> Iterator[List[Tuple[int, str, int, Optional[str]]]]:
+                # Streams task batches off the candidate cursor on demand, so
+                # the next page is fetched while earlier tasks are still running
+                read_cur = con.cursor()
+                read_cur.execute("SELECT file_id, path_abs, size_bytes, quick_hash FROM sha_candidates ORDER BY rowid")
+                small_task_rows = max(task_rows, SMALL_TASK_ROWS)
+                while True:
+                    page = read_cur.fetchmany(PAGE)
+                    if not page:
+                        return
+                    small_rows = [row for row in page if (row[2] or 0) <= SMALL_BATCH_BYTES]
+                    large_rows = [row for row in page if (row[2] or 0) > SMALL_BATCH_BYTES]
+                    for k in range(0, len(small_rows), small_task_rows):
+                        yield small_rows[k:k + small_task_rows]
+                    for k in range(0, len(large_rows), task_rows):
+                        yield large_rows[k:k + task_rows]
+
+            # Rows lost to a dead worker are retried once, one row per task;
+            # a row that is in flight when the pool dies again is marked error
+            sha_retry_rows: deque = deque()
+            sha_crashed_ids: set = set()
+
+            def collect_sha_batch(fut: Any, batch: List[Tuple[int, str, int, Optional[str]]]) -> bool:
+                # Returns False when the pool broke under this task
+                try:
+                    results = fut.result()
+                except BrokenExecutor:
+                    for row in batch:
+                        if row[0] in sha_crashed_ids:
+                            handle_sha_result({"file_id": row[0], "status": "error", "error": _WORKER_DIED_MSG})
+                        else:
+                            sha_crashed_ids.add(row[0])
+                            sha_retry_rows.append(row)
+                    return False
+                for result in results:
+                    handle_sha_result(result)
+                return True
+
+            def next_sha_batches(n: int) -> Iterator[List[Tuple[int, str, int, Optional[str]]]]:
+                while n > 0 and sha_retry_rows:
+                    yield [sha_retry_rows.popleft()]
+                    n -= 1
+                yield from islice(tasks, n)
+
+            # Bounded window of outstanding tasks: refilled as each one finishes
+            # so workers never drain while a page boundary is crossed
+            max_pending = workers * 4
+            pool_restarts = 0
+            ex = new_sha_executor()
+            sha_progress_thread.start()
+            try:
+                tasks = sha_tasks()
+                pending = {ex.submit(_compute_sha256_batch, batch, task_params): batch for batch in next_sha_batches(max_pending)}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    broken = False
+                    for fut in done:
+                        if not collect_sha_batch(fut, pending.pop(fut)):
+                            broken = True
+                    if broken:
+                        # A dead worker (e.g. a crash inside a hashing library)
+                        # fails every queued task; keep what did finish, then
+                        # retry the rest in a fresh pool, or threads if it keeps dying
+                        wait(pending)
+                        for fut, batch in pending.items():
+                            collect_sha_batch(fut, batch)
+                        pending.clear()
+                        flush_sha_updates()
+                        ex.shutdown(wait=False, cancel_futures=True)
+                        pool_restarts += 1
+                        if use_processes and pool_restarts > MAX_POOL_RESTARTS:
+                            use_processes = False
+                            task_params = params
+                        emit_log(
+                            f"[WARN] {hash_name} worker died; continuing in a new "
+                            + ("process pool" if use_processes else "thread pool")
+                        )
+                        ex = new_sha_executor()
+                    if cancelled["flag"]:
+                        emit_log(f"[CANCEL] Stopping {hash_name} (Ctrl+C)")
+                        for fut in pending:
+                            fut.cancel()
+                        break
+                    refill = max_pending - len(pending)
+                    pending.update((ex.submit(_compute_sha256_batch, batch, task_params), batch) for batch in next_sha_batches(refill))
+
+                flush_sha_updates()
+            finally:
+                ex.shutdown(wait=True, cancel_futures=True)
+                sha_progress_stop.set()
+                sha_progress_thread.join()
+            if processed_sha:
+                report_sha_progress()
             emit_log(
                 f"[STAGE 2] Complete: {stats['sha256_count']:,} files verified with {hash_name}"
             )
@@ -922,20 +1126,25 @@ def detect_duplicates(
         # Stage 3: Identify duplicates
         emit_progress("analyze", 0, 0, "Analyzing duplicates...")
         emit_log("[STAGE 3] Analyzing duplicate groups")
-        filt_sql, filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
+        # Only the totals are needed here; the per-group listing is the report's job
         cur.execute(
-            """
-            SELECT sha256, COUNT(*) as count, SUM(size_bytes) as total_size
-            FROM files f
-            WHERE sha256 IS NOT NULL
-              AND state NOT IN ('error', 'missing')
-            """ + filt_sql + " GROUP BY sha256 HAVING COUNT(*) > 1 ORDER BY total_size DESC",
+            f"""
+            SELECT COUNT(*), COALESCE(SUM(cnt), 0), COALESCE(SUM(total_size - total_size / cnt), 0)
+            FROM (
+                SELECT COUNT(*) AS cnt, SUM(size_bytes) AS total_size
+                FROM files f
+                WHERE {hash_col} IS NOT NULL
+                  AND state_code < 8
+            """ + filt_sql + f"""
+                GROUP BY {hash_col}
+                HAVING COUNT(*) > 1
+            )
+            """,
             (*filt_params,),
         )
-        duplicate_groups = cur.fetchall()
-        stats["duplicate_groups"] = len(duplicate_groups)
-        stats["duplicate_files"] = sum(row[1] for row in duplicate_groups)
-        total_wasted_bytes = sum(row[2] - (row[2] / row[1]) for row in duplicate_groups)
+        group_count, duplicate_file_count, total_wasted_bytes = cur.fetchone()
+        stats["duplicate_groups"] = group_count
+        stats["duplicate_files"] = duplicate_file_count
         emit_log(f"[RESULT] Found {stats['duplicate_groups']:,} duplicate groups")
         emit_log(f"[RESULT] {stats['duplicate_files']:,} duplicate files")
         emit_log(f"[RESULT] ~{total_wasted_bytes / (1024**3):.2f} GB wasted space")
@@ -946,7 +1155,7 @@ def detect_duplicates(
             UPDATE files 
             SET state='done' 
             WHERE state IN ('quick_hashed', 'sha_verified')
-              AND sha256 IS NOT NULL
+              AND (sha256 IS NOT NULL OR blake3 IS NOT NULL)
             """
         )
         con.commit()
@@ -968,60 +1177,71 @@ def get_duplicate_report(
     limit: int = 100,
     include_prefixes: Optional[List[str]] = None,
     exclude_prefixes: Optional[List[str]] = None,
+    use_blake3: Optional[bool] = None,
+    cfg: Optional[CatalogConfig] = None,
 ) -> List[Dict]:
     """
     Get a report of duplicate files with details.
+
+    Groups by the content hash column chosen by ``use_blake3``, falling back
+    to ``cfg.dedupe.use_blake3`` and then to the catalog itself (see
+    :func:`content_hash_column`).
     
     Returns list of duplicate groups with:
-    - sha256: The hash
+    - hash: The content hash
+    - sha256: Same value as ``hash`` (kept for existing callers)
+    - hash_column: "blake3" or "sha256"
     - count: Number of duplicates
     - size_bytes: Size of each file
     - total_wasted: Wasted space (total - one copy)
     - paths: List of file paths
     """
-    include_prefixes = include_prefixes or []
-    exclude_prefixes = exclude_prefixes or []
+    filt_sql, filt_params = build_path_filter_sql(include_prefixes or [], exclude_prefixes or [], 'f')
+    if use_blake3 is None and cfg is not None:
+        use_blake3 = cfg.dedupe.use_blake3
 
     con = connect(db_path)
     try:
         cur = con.cursor()
+        hash_col = content_hash_column(use_blake3, con)
 
-        filt_sql, filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
+        # Top groups and their member paths in one statement, instead of a
+        # second lookup per group; rows arrive grouped, largest waste first
         cur.execute(
+            f"""
+            WITH g AS (
+                SELECT {hash_col} AS digest, COUNT(*) AS cnt, size_bytes
+                FROM files f
+                WHERE {hash_col} IS NOT NULL
+                  AND state_code < 8
             """
-            SELECT sha256, COUNT(*) as count, size_bytes
-            FROM files f
-            WHERE sha256 IS NOT NULL
-              AND state NOT IN ('error', 'missing')
+            + filt_sql +
+            f"""
+                GROUP BY {hash_col}
+                HAVING COUNT(*) > 1
+                ORDER BY size_bytes * (COUNT(*) - 1) DESC
+                LIMIT ?
+            )
+            SELECT g.digest, g.cnt, g.size_bytes, f.path_abs, f.mtime_utc
+            FROM g
+            JOIN files f ON f.{hash_col} = g.digest
+            WHERE 1 = 1
             """
             + filt_sql +
-            " GROUP BY sha256 HAVING COUNT(*) > 1 ORDER BY size_bytes * (COUNT(*) - 1) DESC LIMIT ?",
-            (*filt_params, limit),
+            " ORDER BY g.size_bytes * (g.cnt - 1) DESC, g.digest, f.mtime_utc ASC",
+            (*filt_params, limit, *filt_params),
         )
-        
+
         results = []
-        for row in cur.fetchall():
-            sha256, count, size_bytes = row
-            
-            # Get all paths for this duplicate group
-            path_filt_sql, path_filt_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
-            cur.execute(
-                """
-                SELECT path_abs, mtime_utc
-                FROM files f
-                WHERE sha256 = ?
-                """ + path_filt_sql + " ORDER BY mtime_utc ASC",
-                (sha256, *path_filt_params),
-            )
-            
-            paths = [{"path": p[0], "mtime": p[1]} for p in cur.fetchall()]
-            
+        for (digest, count, size_bytes), members in groupby(cur, key=lambda r: (r[0], r[1], r[2])):
             results.append({
-                "sha256": sha256,
+                "hash": digest,
+                "sha256": digest,
+                "hash_column": hash_col,
                 "count": count,
                 "size_bytes": size_bytes,
                 "total_wasted": size_bytes * (count - 1),
-                "paths": paths
+                "paths": [{"path": m[3], "mtime": m[4]} for m in members],
             })
         
         return results
@@ -1037,8 +1257,9 @@ def prune_hash_duplicates(
     dry_run: bool = True,
     keep_strategy: str = "oldest",
     log_cb: Optional[LogCallback] = None,
+    use_blake3: Optional[bool] = None,
 ) -> Dict[str, Any]:
-    """Remove duplicate files (based on SHA256) from disk and database."""
+    """Remove duplicate files (based on the content hash) from disk and database."""
 
     include_prefixes = include_prefixes or []
     exclude_prefixes = exclude_prefixes or []
@@ -1087,15 +1308,18 @@ def prune_hash_duplicates(
     try:
         cur = con.cursor()
 
+        if use_blake3 is None:
+            use_blake3 = cfg.dedupe.use_blake3
+        hash_col = content_hash_column(use_blake3, con)
         filter_sql, filter_params = build_path_filter_sql(include_prefixes, exclude_prefixes, 'f')
         cur.execute(
-            """
-            SELECT sha256, COUNT(*) AS cnt, MIN(size_bytes) AS size_bytes
+            f"""
+            SELECT {hash_col}, COUNT(*) AS cnt, MIN(size_bytes) AS size_bytes
             FROM files f
-            WHERE sha256 IS NOT NULL
-              AND state NOT IN ('error', 'missing')
-            """ + filter_sql + """
-            GROUP BY sha256
+            WHERE {hash_col} IS NOT NULL
+              AND state_code < 8
+            """ + filter_sql + f"""
+            GROUP BY {hash_col}
             HAVING COUNT(*) > 1
             ORDER BY cnt DESC
             """,
@@ -1104,7 +1328,7 @@ def prune_hash_duplicates(
         duplicate_hashes = cur.fetchall()
 
         if not duplicate_hashes:
-            emit_log("[HASH-PRUNE] No SHA256 duplicate groups found.")
+            emit_log(f"[HASH-PRUNE] No {hash_col.upper()} duplicate groups found.")
             return stats
 
         stats["hash_groups"] = len(duplicate_hashes)
@@ -1120,18 +1344,18 @@ def prune_hash_duplicates(
             except Exception:
                 return 0.0
 
-        for sha256, count, size_bytes in duplicate_hashes:
+        for digest, count, size_bytes in duplicate_hashes:
             group_sql = (
-                """
+                f"""
                 SELECT file_id, path_abs, size_bytes, mtime_utc
                 FROM files f
-                WHERE sha256 = ?
-                  AND state NOT IN ('error', 'missing')
+                WHERE {hash_col} = ?
+                  AND state_code < 8
                 """
                 + filter_sql
                 + " ORDER BY mtime_utc"
             )
-            cur.execute(group_sql, (sha256, *filter_params))
+            cur.execute(group_sql, (digest, *filter_params))
             members_raw = cur.fetchall()
             if len(members_raw) <= 1:
                 continue
@@ -1169,7 +1393,7 @@ def prune_hash_duplicates(
 
             stats["groups"].append(
                 {
-                    "sha256": sha256,
+                    "hash": digest,
                     "count": count,
                     "size_bytes": size_bytes,
                     "keeper": keeper,
@@ -1181,7 +1405,7 @@ def prune_hash_duplicates(
                 continue
 
             emit_log(
-                f"[HASH-PRUNE] Removing {len(duplicates)} duplicates for hash {sha256[:12]}…"
+                f"[HASH-PRUNE] Removing {len(duplicates)} duplicates for hash {digest[:12]}…"
             )
 
             file_ids_to_delete: List[int] = []
@@ -1,36 +1,71 @@
 from __future__ import annotations
 import argparse
+import functools
+import os
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence
 
 import duckdb
 
+# Rows per Parquet row group; lets DuckDB flush groups as it streams
+ROW_GROUP_SIZE = 100_000
+
+DEFAULT_TABLES = ("files", "scans")
+
+
+@functools.lru_cache(maxsize=1)
+def _duckdb_connection() -> duckdb.DuckDBPyConnection:
+    """Process-wide DuckDB connection with the sqlite extension loaded.
+
+    Reused across exports so repeated calls skip DuckDB startup and the
+    extension install/load.
+    """
+    con = duckdb.connect(database=":memory:")
+    con.execute("INSTALL sqlite; LOAD sqlite;")
+    # Stream rows straight from sqlite_scan into the Parquet writer; row order
+    # in the output is not preserved, which lets every thread write row groups
+    con.execute(f"PRAGMA threads={os.cpu_count() or 1};")
+    con.execute("PRAGMA preserve_insertion_order=false;")
+    return con
+
+
+def export_tables(
+    db_path: Path,
+    out_dir: Path,
+    tables: Sequence[str] = DEFAULT_TABLES,
+    memory_limit: str = "4GB",
+) -> None:
+    """Write each catalog table in ``tables`` to ``out_dir/<table>.parquet``."""
+    db_path = Path(db_path)
+    if not db_path.exists():
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    con = _duckdb_connection()
+    # DuckDB doesn't support parameter placeholders for PRAGMA values or COPY
+    # targets. Safely quote them by doubling single quotes.
+    memory_limit_quoted = memory_limit.replace("'", "''")
+    con.execute(f"PRAGMA memory_limit='{memory_limit_quoted}';")
+    db_quoted = str(db_path).replace("'", "''")
+    for table in tables:
+        table_quoted = table.replace("'", "''")
+        out_quoted = str(out_dir / f"{table}.parquet").replace("'", "''")
+        con.execute(
+            f"COPY (SELECT * FROM sqlite_scan('{db_quoted}', '{table_quoted}')) TO '{out_quoted}' "
+            f"(FORMAT PARQUET, COMPRESSION 'zstd', ROW_GROUP_SIZE {ROW_GROUP_SIZE}, OVERWRITE TRUE);"
+        )
+
 
 def main(argv: Optional[Iterable[str]] = None) -> None:
     ap = argparse.ArgumentParser(description="Export SQLite tables to Parquet via DuckDB")
     ap.add_argument("--db", required=True)
     ap.add_argument("--out", required=True)
+    ap.add_argument("--memory-limit", default="4GB", help="DuckDB memory limit for the export (default: 4GB)")
     args = ap.parse_args(list(argv) if argv is not None else None)
 
     out = Path(args.out)
-    out.mkdir(parents=True, exist_ok=True)
-    
-    # Validate database path exists
-    db_path = Path(args.db)
-    if not db_path.exists():
-        raise FileNotFoundError(f"Database not found: {db_path}")
-    
-    con = duckdb.connect(database=":memory:")
-    # DuckDB doesn't support parameter placeholders for ATTACH/COPY targets.
-    # Safely quote paths by doubling single quotes.
-    db_quoted = str(db_path).replace("'", "''")
-    files_out_quoted = str(out / "files.parquet").replace("'", "''")
-    scans_out_quoted = str(out / "scans.parquet").replace("'", "''")
-
-    con.execute(f"ATTACH DATABASE '{db_quoted}' AS cat (TYPE SQLITE);")
-    con.execute(f"COPY (SELECT * FROM cat.files) TO '{files_out_quoted}' (FORMAT PARQUET, OVERWRITE TRUE);")
-    con.execute(f"COPY (SELECT * FROM cat.scans) TO '{scans_out_quoted}' (FORMAT PARQUET, OVERWRITE TRUE);")
-    con.close()
+    export_tables(Path(args.db), out, memory_limit=args.memory_limit)
     print(f"[OK] Parquet written to {out}")
 
 if __name__ == '__main__':
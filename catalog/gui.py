@@ -1,63 +1,69 @@
 from __future__ import annotations
-import os, sqlite3, subprocess, sys
+import logging, os, sqlite3, subprocess, sys, threading
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 from functools import partial
 from concurrent.futures import Future, ThreadPoolExecutor
 from PySide6 import QtWidgets, QtCore, QtGui
 from PySide6.QtCore import Qt, QModelIndex, QPersistentModelIndex
 
 from .config import CatalogConfig, ScannerConfig, load_config
+from .db import connect_readonly, has_files_fts
 from .scan import scan_root
 
+logger = logging.getLogger(__name__)
 
-class ScanWorker(QtCore.QObject):
-    progress = QtCore.Signal(str, int, int, str)
-    log = QtCore.Signal(str)
+class ScanProgress:
+    """Latest scan progress, written by the worker and polled by the GUI.
+
+    Replacing the tuple is a single reference store, so neither side locks
+    and the worker posts no event per update.
+    """
+
+    __slots__ = ("latest",)
+
+    def __init__(self) -> None:
+        self.latest: Optional[tuple[str, int, int, str]] = None
+
+
+class ScanSignals(QtCore.QObject):
     finished = QtCore.Signal()
     failed = QtCore.Signal(str)
 
-    def __init__(self, root_path: Path, db_path: Path, config_path: Optional[Path] = None, overrides: Optional[Dict[str, int]] = None, parent: Optional[QtCore.QObject] = None):
-        super().__init__(parent)
+
+class ScanWorker(QtCore.QRunnable):
+    """One scan, run on the main window's persistent scan thread pool.
+
+    QRunnable cannot emit signals itself, so they live on ``signals``.
+    Progress and log lines are high-frequency and bypass signals: they go
+    to ``progress`` and the ``log_buffer`` deque, which the GUI drains on
+    its timers.
+    """
+
+    def __init__(self, root_path: Path, config: CatalogConfig, log_buffer: deque):
+        super().__init__()
+        self.signals = ScanSignals()
+        self.progress = ScanProgress()
         self._root = Path(root_path)
-        self._db_path = Path(db_path)
-        self._config_path = config_path
-        self._overrides = overrides or {}
+        self._config = config
+        self._log_buffer = log_buffer
 
-    @QtCore.Slot()
     def run(self) -> None:
+        signals = self.signals
+        progress = self.progress
         try:
-            cfg = self._load_config()
-
             def on_progress(stage: str, current: int, total: int, message: str) -> None:
-                self.progress.emit(stage, current, total, message)
+                progress.latest = (stage, current, total, message)
 
-            def on_log(message: str) -> None:
-                self.log.emit(message)
+            # deque.append is thread-safe; no Qt string conversion per line
+            on_log = self._log_buffer.append
 
-            scan_root(str(self._root), cfg, progress_cb=on_progress, log_cb=on_log)
-            self.finished.emit()
+            scan_root(str(self._root), self._config, progress_cb=on_progress, log_cb=on_log)
+            signals.finished.emit()
         except Exception as e:
-            self.failed.emit(str(e))
-
-    def _load_config(self) -> CatalogConfig:
-        cfg: CatalogConfig
-        if self._config_path and self._config_path.exists():
-            cfg = load_config(self._config_path)
-        else:
-            cfg = CatalogConfig(roots=[str(self._root)])
-        cfg.roots = [str(self._root)]
-        cfg.db.path = str(self._db_path)
-        for key, value in self._overrides.items():
-            if value is None:
-                continue
-            if hasattr(cfg.scanner, key):
-                setattr(cfg.scanner, key, value)
-        self.log.emit(
-            "[RUN] Effective scanner settings: max_workers=%s, chunk_bytes=%s"
-            % (cfg.scanner.max_workers, cfg.scanner.io_chunk_bytes)
-        )
-        return cfg
+            signals.failed.emit(str(e))
 
 
 DISPLAY_ROLE = int(Qt.ItemDataRole.DisplayRole)
@@ -67,31 +73,52 @@ TOOLTIP_ROLE = int(Qt.ItemDataRole.ToolTipRole)
 NO_ITEM_FLAGS = Qt.ItemFlag.NoItemFlags
 ENABLED_ITEM_FLAG = Qt.ItemFlag.ItemIsEnabled
 SELECTABLE_ITEM_FLAG = Qt.ItemFlag.ItemIsSelectable
-CASE_INSENSITIVE = Qt.CaseSensitivity.CaseInsensitive
 SPLIT_HORIZONTAL = Qt.Orientation.Horizontal
+QUEUED_CONNECTION = Qt.ConnectionType.QueuedConnection
 
 FILE_PATH_ROLE = USER_ROLE + 1
 IS_DIRECTORY_ROLE = USER_ROLE + 2
 ROW_DATA_ROLE = USER_ROLE + 3
 
+# Fields the explorer's text filter searches
+HAYSTACK_FIELDS = ("path_abs", "name", "ext", "state", "error_msg")
+# Joins the haystack fields. The filter box is a single line, so a match can
+# never span two fields, the same per-field semantics the SQL filter has
+HAYSTACK_SEPARATOR = "\n"
+# Sort columns declared NOT NULL. A row-value seek never matches NULL, so
+# ext and error_msg keep OFFSET paging
+KEYSET_SORT_COLUMNS = frozenset(
+    {"path_abs", "dir", "name", "size_bytes", "mtime_utc", "ctime_utc", "state"}
+)
+
+
+# (divisor, unit) by bit length, so picking the unit is one tuple index. Sizes
+# come from an SQLite INTEGER, which fits in 64 bits
+_BYTE_SCALES = tuple(
+    (float(1 << (10 * e)), ("B", "KB", "MB", "GB", "TB", "PB", "EB")[e])
+    for e in (min(max(bits - 1, 0) // 10, 6) for bits in range(65))
+)
+
 
 def format_bytes(size: Optional[int]) -> str:
     if size is None:
         return ""
     if size < 1024:
         return f"{size} B"
-    units = ["KB", "MB", "GB", "TB", "PB"]
-    value = float(size)
-    for unit in units:
-        value /= 1024.0
-        if value < 1024.0:
-            return f"{value:.1f} {unit}"
-    return f"{value:.1f} EB"
+    # Powers of two divide exactly, so this matches repeated division by 1024
+    divisor, unit = _BYTE_SCALES[size.bit_length()]
+    return f"{size / divisor:.1f} {unit}"
 
 
 def row_get(row: Any, key: str, default: Any = None) -> Any:
     if isinstance(row, dict):
         return row.get(key, default)
+    if isinstance(row, sqlite3.Row):
+        # The explorer's own queries return Rows; index them by name directly
+        try:
+            return row[key]
+        except IndexError:
+            return default
     if row is None:
         return default
     getter = getattr(row, "get", None)
@@ -114,9 +141,81 @@ def row_get(row: Any, key: str, default: Any = None) -> Any:
     return default
 
 
+def db_change_token(db_path: Path) -> Optional[tuple]:
+    """Cheap "has the catalog changed" token from stat() alone.
+
+    Under WAL, commits land in the -wal file and only reach the main file
+    at checkpoints, so both are included. Returns None if the database is
+    missing.
+    """
+    try:
+        st = db_path.stat()
+    except OSError:
+        return None
+    try:
+        wal = Path(f"{db_path}-wal").stat()
+        wal_key = (wal.st_mtime_ns, wal.st_size)
+    except OSError:
+        wal_key = None
+    return (str(db_path), st.st_mtime_ns, st.st_size, wal_key)
+
+
+# Read-only catalog connection reused across queries by the explorer's single
+# loader thread, so each load skips opening the file, re-running pragmas and
+# re-mapping it. The GUI thread must not query through it; the stats panel
+# keeps its own connection on its own thread
+_read_local = threading.local()
+
+
+def read_connection(db_path: Path) -> sqlite3.Connection:
+    """Return this thread's read-only connection to ``db_path``, reopening it
+    if the path changed or the file was replaced."""
+    st = db_path.stat()
+    key = (str(db_path), st.st_dev, st.st_ino)
+    cached = getattr(_read_local, "cached", None)
+    if cached is not None:
+        if cached[0] == key:
+            return cached[1]
+        cached[1].close()
+        _read_local.cached = None
+    con = connect_readonly(db_path)
+    _read_local.cached = (key, con)
+    return con
+
+
+def close_read_connection() -> None:
+    """Close this thread's cached read connection, if it has one."""
+    cached = getattr(_read_local, "cached", None)
+    _read_local.cached = None
+    if cached is not None:
+        cached[1].close()
+
+
+@contextmanager
+def read_snapshot(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Hold one read transaction on this thread's connection to ``db_path``,
+    so every query inside sees the same commit of the catalog."""
+    con = read_connection(db_path)
+    con.execute("BEGIN")
+    try:
+        yield con
+    finally:
+        try:
+            con.rollback()
+        except sqlite3.ProgrammingError:
+            pass  # Reopened mid-load because the file was replaced
+
+
+def row_haystack(row: Any) -> str:
+    """Lowercased text the explorer filter matches against for ``row``."""
+    return HAYSTACK_SEPARATOR.join(part for part in (row_get(row, key) for key in HAYSTACK_FIELDS) if part).lower()
+
+
 def row_as_dict(row: Any) -> Dict[str, Any]:
     if isinstance(row, dict):
         return dict(row)
+    if isinstance(row, sqlite3.Row):
+        return dict(zip(row.keys(), row))
     result: Dict[str, Any] = {}
     keys_method = getattr(row, "keys", None)
     if callable(keys_method):
@@ -136,10 +235,25 @@ class FileTableModel(QtCore.QAbstractTableModel):
         ("state", "State"),
         ("error_msg", "Error"),
     ]
+    # Columns kept as per-field lists: the displayed ones plus what tooltips
+    # read
+    _COLUMN_KEYS = tuple(dict.fromkeys([key for key, _ in COLUMNS] + ["path_abs"]))
+    # Few distinct values per page; interned so equal cells share one string
+    _INTERNED_KEYS = frozenset({"ext", "state"})
+    _SIZE_COLUMN = [key for key, _ in COLUMNS].index("size_bytes")
+    # Column whose tooltip shows another field (or its own value)
+    _TOOLTIP_KEYS = {"name": "path_abs", "dir": "path_abs", "error_msg": "error_msg"}
 
     def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
         super().__init__(parent)
         self._rows: List[Any] = []
+        self._cols: Dict[str, Sequence[Any]] = {key: () for key in self._COLUMN_KEYS}
+        # Display values per column position, ready to return from data()
+        self._display: List[List[Any]] = [[] for _ in self.COLUMNS]
+        # Raw values and tooltip source per column position, so data() never
+        # maps a column number back to a field name
+        self._values: List[Sequence[Any]] = [() for _ in self.COLUMNS]
+        self._tooltips: List[Optional[Sequence[Any]]] = [None for _ in self.COLUMNS]
 
     def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
         if parent.isValid():
@@ -152,26 +266,17 @@ class FileTableModel(QtCore.QAbstractTableModel):
     def data(self, index: QModelIndex | QPersistentModelIndex, role: int = DISPLAY_ROLE) -> Any:
         if not index.isValid():
             return None
-        row = self._rows[index.row()]
-        key = self.COLUMNS[index.column()][0]
-        value = row_get(row, key)
+        r = index.row()
+        column = index.column()
         if role == DISPLAY_ROLE:
-            if key == "size_bytes":
-                return format_bytes(value)
-            if value is None:
-                return ""
-            return value
+            return self._display[column][r]
         if role == USER_ROLE:
-            if key == "size_bytes":
-                return value or 0
-            return value or ""
+            return self._values[column][r] or (0 if column == self._SIZE_COLUMN else "")
         if role == TOOLTIP_ROLE:
-            if key in {"name", "dir"}:
-                return row_get(row, "path_abs")
-            if key == "error_msg" and value:
-                return value
+            tooltips = self._tooltips[column]
+            return None if tooltips is None else tooltips[r] or None
         if role == ROW_DATA_ROLE:
-            return row_as_dict(row)
+            return row_as_dict(self._rows[r])
         return None
 
     def headerData(self, section: int, orientation: Qt.Orientation, role: int = DISPLAY_ROLE) -> Any:
@@ -185,15 +290,50 @@ class FileTableModel(QtCore.QAbstractTableModel):
         return ENABLED_ITEM_FLAG | SELECTABLE_ITEM_FLAG
 
     def set_rows(self, rows: Sequence[Any]) -> None:
-        print(f"� Updating table model with {len(rows)} rows")
-        self.beginResetModel()
-        self._rows = list(rows)
-        self.endResetModel()
+        # Columns never change, so a new page is reported as changed cells plus
+        # the rows gained or lost; a reset would make the view drop its layout
+        old_count = len(self._rows)
+        new_count = len(rows)
+        root = QModelIndex()
+        if new_count < old_count:
+            self.beginRemoveRows(root, new_count, old_count - 1)
+            self._store(rows)
+            self.endRemoveRows()
+        elif new_count > old_count:
+            self.beginInsertRows(root, old_count, new_count - 1)
+            self._store(rows)
+            self.endInsertRows()
+        else:
+            self._store(rows)
+        kept = min(old_count, new_count)
+        if kept:
+            self.dataChanged.emit(self.index(0, 0), self.index(kept - 1, len(self.COLUMNS) - 1))
 
-    def row_data(self, row: int) -> Dict[str, Any]:
-        if 0 <= row < len(self._rows):
-            return row_as_dict(self._rows[row])
-        return {}
+    def _store(self, rows: Sequence[Any]) -> None:
+        self._rows = list(rows)
+        self._cols = self._columns(self._rows)
+        self._display = [self._display_column(key) for key, _ in self.COLUMNS]
+        self._values = [self._cols[key] for key, _ in self.COLUMNS]
+        self._tooltips = [
+            self._cols[self._TOOLTIP_KEYS[key]] if key in self._TOOLTIP_KEYS else None
+            for key, _ in self.COLUMNS
+        ]
+
+    @classmethod
+    def _columns(cls, rows: List[Any]) -> Dict[str, Sequence[Any]]:
+        """Transpose rows into one sequence per field in ``_COLUMN_KEYS``."""
+        if rows and isinstance(rows[0], sqlite3.Row):
+            by_name = dict(zip(rows[0].keys(), zip(*rows)))
+            return {key: by_name.get(key) or (None,) * len(rows) for key in cls._COLUMN_KEYS}
+        return {key: [row_get(row, key) for row in rows] for key in cls._COLUMN_KEYS}
+
+    def _display_column(self, key: str) -> List[Any]:
+        values = self._cols[key]
+        if key == "size_bytes":
+            return [format_bytes(size) for size in values]
+        if key in self._INTERNED_KEYS:
+            return [sys.intern(value) if isinstance(value, str) else ("" if value is None else value) for value in values]
+        return ["" if value is None else value for value in values]
 
     def raw_row(self, row: int) -> Any:
         if 0 <= row < len(self._rows):
@@ -201,66 +341,271 @@ class FileTableModel(QtCore.QAbstractTableModel):
         return {}
 
 
+class TreeNodes:
+    """The parallel per-node lists behind :class:`CatalogTreeModel`.
+
+    Plain Python with no Qt objects, so a tree can be built on a worker
+    thread and handed to the model in one reset.
+    """
+
+    __slots__ = (
+        "names", "paths", "parents", "positions", "children",
+        "rows", "size_display", "states", "haystacks",
+    )
+
+    def __init__(self) -> None:
+        self.names: List[str] = [""]
+        self.paths: List[str] = [""]
+        self.parents: List[int] = [-1]
+        self.positions: List[int] = [0]
+        self.children: List[List[int]] = [[]]
+        self.rows: List[Any] = [None]
+        self.size_display: List[str] = [""]
+        self.states: List[str] = [""]
+        self.haystacks: List[str] = [""]
+
+    @classmethod
+    def build(cls, rows: Sequence[Any], limit: int = 0) -> tuple["TreeNodes", bool]:
+        """Build a tree from ``rows``; the flag is True if ``limit`` cut it short."""
+        nodes = cls()
+        dir_ids: Dict[str, int] = {}
+
+        def ensure_directory(path_str: str) -> int:
+            if not path_str:
+                return 0
+            node = dir_ids.get(path_str)
+            if node is not None:
+                return node
+            # Resolve the parent through the same cache, so a new directory
+            # costs one split instead of a walk from the drive root
+            head, tail = os.path.split(path_str)
+            if not tail and head != path_str:
+                node = ensure_directory(head)  # trailing separator
+            else:
+                parent = 0 if not tail or head == path_str else ensure_directory(head)
+                node = nodes.add(parent, tail or path_str, path_str, None)
+            dir_ids[path_str] = node
+            return node
+
+        for idx, row in enumerate(rows):
+            if limit and idx >= limit:
+                return nodes, True
+            dir_path = row_get(row, "dir", "")
+            parent = ensure_directory(dir_path if isinstance(dir_path, str) else "")
+            nodes.add(parent, row_get(row, "name") or "", row_get(row, "path_abs") or "", row)
+        return nodes, False
+
+    def add(self, parent: int, name: str, path: str, row: Any) -> int:
+        node = len(self.names)
+        siblings = self.children[parent]
+        self.names.append(name)
+        self.paths.append(path)
+        self.parents.append(parent)
+        self.positions.append(len(siblings))
+        self.children.append([])
+        self.rows.append(row)
+        if row is None:
+            self.size_display.append("")
+            self.states.append("")
+            self.haystacks.append("")
+        else:
+            self.size_display.append(format_bytes(row_get(row, "size_bytes")))
+            self.states.append(sys.intern(row_get(row, "state") or ""))
+            self.haystacks.append(row_haystack(row))
+        siblings.append(node)
+        return node
+
+
+class CatalogTreeModel(QtCore.QAbstractItemModel):
+    """Directory tree over catalog rows, stored as parallel per-node lists.
+
+    Node 0 is the invisible root; an index's internalId() is its node id.
+    Directories have no catalog row. A file costs one entry per list rather
+    than four QStandardItems, each with its own role map.
+    """
+
+    HEADERS = ("Name", "Size", "Ext", "State")
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        # Bumped on every rebuild so cached filter results can tell they are stale
+        self.generation = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._use(TreeNodes())
+
+    def _use(self, nodes: "TreeNodes") -> None:
+        self._names = nodes.names
+        self._paths = nodes.paths
+        self._parents = nodes.parents
+        self._positions = nodes.positions
+        self._children = nodes.children
+        self._rows = nodes.rows
+        self._size_display = nodes.size_display
+        self._states = nodes.states
+        self._haystacks = nodes.haystacks
+
+    def set_nodes(self, nodes: "TreeNodes") -> None:
+        """Swap in a tree built by :meth:`TreeNodes.build`."""
+        self.beginResetModel()
+        try:
+            self.generation += 1
+            self._use(nodes)
+        finally:
+            self.endResetModel()
+
+    def set_rows(self, rows: Sequence[Any], limit: int = 0) -> bool:
+        """Rebuild the tree from ``rows``; returns True if ``limit`` cut it short."""
+        nodes, truncated = TreeNodes.build(rows, limit)
+        self.set_nodes(nodes)
+        return truncated
+
+    def index(self, row: int, column: int, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> QModelIndex:
+        siblings = self._children[parent.internalId() if parent.isValid() else 0]
+        if 0 <= row < len(siblings) and 0 <= column < len(self.HEADERS):
+            return self.createIndex(row, column, siblings[row])
+        return QModelIndex()
+
+    def parent(self, index: Optional[QModelIndex | QPersistentModelIndex] = None) -> Any:  # type: ignore[override]
+        if index is None:
+            return super().parent()
+        if not index.isValid():
+            return QModelIndex()
+        parent = self._parents[index.internalId()]
+        if parent <= 0:
+            return QModelIndex()
+        return self.createIndex(self._positions[parent], 0, parent)
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._children[0])
+        if parent.column() > 0:
+            return 0
+        return len(self._children[parent.internalId()])
+
+    def columnCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return len(self.HEADERS)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = DISPLAY_ROLE) -> Any:
+        if not index.isValid():
+            return None
+        node = index.internalId()
+        row = self._rows[node]
+        column = index.column()
+        if role == DISPLAY_ROLE:
+            if column == 0:
+                return self._names[node]
+            if row is None:
+                return ""
+            if column == 1:
+                return self._size_display[node]
+            if column == 3:
+                return self._states[node]
+            return row_get(row, "ext") or ""
+        if role == USER_ROLE:
+            if column == 1 and row is not None:
+                return row_get(row, "size_bytes") or 0
+            return None
+        if role == FILE_PATH_ROLE:
+            return self._paths[node]
+        if role == IS_DIRECTORY_ROLE:
+            return row is None
+        if role == ROW_DATA_ROLE:
+            return row
+        return None
+
+    def match_files(self, filter_text: str, state_filter: str, candidates: Optional[Iterable[int]] = None) -> set:
+        """Node ids of files matching the explorer filter, in one pass over
+        the haystack list. ``candidates`` limits the pass to a known superset."""
+        nodes = range(1, len(self._names)) if candidates is None else candidates
+        haystacks = self._haystacks
+        states = self._states
+        if state_filter == "All":
+            return {n for n in nodes if self._rows[n] is not None and filter_text in haystacks[n]}
+        return {n for n in nodes if states[n] == state_filter and filter_text in haystacks[n]}
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = DISPLAY_ROLE) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == DISPLAY_ROLE:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex | QPersistentModelIndex):
+        if not index.isValid():
+            return NO_ITEM_FLAGS
+        return ENABLED_ITEM_FLAG | SELECTABLE_ITEM_FLAG
+
+
 class FileFilterProxyModel(QtCore.QSortFilterProxyModel):
     def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
         super().__init__(parent)
         self._filter_text: str = ""
         self._state_filter: str = "All"
-        self._row_accessor: Optional[Callable[[int], Dict[str, Any]]] = None
-
-    def setRowAccessor(self, accessor: Callable[[int], Dict[str, Any]]) -> None:
-        self._row_accessor = accessor
 
     def setFilterText(self, text: str) -> None:
-        self._filter_text = (text or "").strip().lower()
-        self.invalidateFilter()
+        text = (text or "").strip().lower()
+        if text != self._filter_text:
+            self._filter_text = text
+            # Rows only; columns are never filtered and sorting is kept as is
+            self.invalidateRowsFilter()
 
     def setStateFilter(self, state: str) -> None:
-        self._state_filter = state or "All"
-        self.invalidateFilter()
+        state = state or "All"
+        if state != self._state_filter:
+            self._state_filter = state
+            self.invalidateRowsFilter()
 
-    def matches(self, row: Dict[str, Any]) -> bool:
-        return self._accept_row(row)
+    def is_active(self) -> bool:
+        return bool(self._filter_text) or self._state_filter != "All"
 
-    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex | QPersistentModelIndex) -> bool:
-        row: Dict[str, Any]
-        if self._row_accessor:
-            row = self._row_accessor(source_row)
-        else:
-            model = self.sourceModel()
-            if hasattr(model, "row_data"):
-                row = model.row_data(source_row)
-            else:
-                row = {}
-        return self._accept_row(row)
 
-    def _accept_row(self, row: Dict[str, Any]) -> bool:
-        if not row:
-            return False
-        if self._state_filter != "All":
-            if (row_get(row, "state") or "") != self._state_filter:
-                return False
-        if self._filter_text:
-            haystack = " ".join(
-                part for part in [
-                    row_get(row, "path_abs"),
-                    row_get(row, "name"),
-                    row_get(row, "ext"),
-                    row_get(row, "state"),
-                    row_get(row, "error_msg"),
-                ]
-                if part
-            ).lower()
-            if self._filter_text not in haystack:
-                return False
-        return True
+class TreeFilterProxyModel(FileFilterProxyModel):
+    """Filters the directory tree in place instead of rebuilding it.
+
+    Matching files are computed in bulk by :meth:`CatalogTreeModel.match_files`
+    and cached per (tree generation, text, state); recursive filtering keeps a
+    directory visible while any descendant matches.
+    """
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self.setRecursiveFilteringEnabled(True)
+        self._matches: set = set()
+        self._matches_key: Optional[tuple] = None
+
+    def _matching_nodes(self) -> set:
+        model = self.sourceModel()
+        key = (model.generation, self._filter_text, self._state_filter)
+        if key != self._matches_key:
+            prev = self._matches_key
+            # Typing more text can only drop matches, so re-test just the
+            # previous hits instead of every file in the tree
+            narrowing = prev is not None and prev[0] == key[0] and prev[2] == key[2] and prev[1] in key[1]
+            self._matches = model.match_files(self._filter_text, self._state_filter, self._matches if narrowing else None)
+            self._matches_key = key
+        return self._matches
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex | QPersistentModelIndex) -> bool:
+        if not self.is_active():
+            return True
+        node = self.sourceModel().index(source_row, 0, source_parent).internalId()
+        return node in self._matching_nodes()
 
 
 class FileExplorerWidget(QtWidgets.QWidget):
+    # Emitted from the loader thread; Qt queues delivery onto the GUI thread
+    _pageLoaded = QtCore.Signal(object, object, int, object)
+    _pageFailed = QtCore.Signal(object, str)
+    _treeBuilt = QtCore.Signal(int, object)
+    _treeFailed = QtCore.Signal(int, str)
+    # Only these names are ever spliced into ORDER BY
+    _SORT_COLUMNS = frozenset(key for key, _ in FileTableModel.COLUMNS) | {"path_abs", "file_id"}
+
     def __init__(self, db_path_provider: Callable[[], Path], parent: Optional[QtWidgets.QWidget] = None) -> None:
         super().__init__(parent)
         self._db_path_provider = db_path_provider
         self._cached_db_path: Optional[Path] = None
+        self._cached_db_token: Optional[tuple] = None
         self._rows: List[Any] = []
         self._needs_reload = True
         self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=1)
@@ -269,13 +614,32 @@ class FileExplorerWidget(QtWidgets.QWidget):
         self._pending_reload = False
         self._requested_db_path: Optional[Path] = None
         self._active_db_path: Optional[Path] = None
+        self._pageLoaded.connect(self._handle_future_success)
+        self._pageFailed.connect(self._handle_future_failure)
         self._tree_dirty = True
         self._tree_row_limit = 50000
+        # True when the tree holds every catalog row, so filters can be
+        # applied through the tree proxy without going back to the database
+        self._tree_complete = False
+        # Trees are fetched and built on the executor; results from an older
+        # request than _tree_request are dropped
+        self._tree_request = 0
+        self._tree_building = False
+        self._treeBuilt.connect(self._on_tree_built)
+        self._treeFailed.connect(self._on_tree_failed)
         
         # Pagination state
         self._current_page = 1
         self._page_size = 100
         self._total_rows = 0
+        # (sort value, file_id) of the first and last row of each page loaded
+        # for the current query, so neighbouring pages seek instead of OFFSET
+        self._page_bounds: Dict[int, tuple] = {}
+        self._page_bounds_key: Optional[tuple] = None
+        self._loading_page = 1
+        # Filtered row counts by (db token, filter text, state); page turns
+        # within one filter reuse the count instead of re-running COUNT(*)
+        self._count_cache: Dict[tuple, int] = {}
         
         # Sorting state
         self._sort_column = "path_abs"  # Default sort column
@@ -352,17 +716,12 @@ class FileExplorerWidget(QtWidgets.QWidget):
         layout.addWidget(self.stack, 1)
 
         # Table view setup
+        # Pages arrive filtered and ordered by SQL, so the view reads the model
+        # directly; its sort() is a no-op and header clicks only re-query
         self.tableModel = FileTableModel(self)
-        self.proxyModel = FileFilterProxyModel(self)
-        self.proxyModel.setSourceModel(self.tableModel)
-        self.proxyModel.setRowAccessor(lambda idx: row_as_dict(self.tableModel.raw_row(idx)))
-        self.proxyModel.setFilterCaseSensitivity(CASE_INSENSITIVE)
-        self.proxyModel.setSortCaseSensitivity(CASE_INSENSITIVE)
-        # Disable proxy model sorting - we do database-level sorting instead
-        self.proxyModel.setDynamicSortFilter(False)
 
         self.tableView = QtWidgets.QTableView()
-        self.tableView.setModel(self.proxyModel)
+        self.tableView.setModel(self.tableModel)
         self.tableView.setSortingEnabled(True)
         self.tableView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
         self.tableView.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
@@ -378,10 +737,11 @@ class FileExplorerWidget(QtWidgets.QWidget):
         self.stack.addWidget(self.tableView)
 
         # Tree view setup
-        self.treeModel = QtGui.QStandardItemModel()
-        self.treeModel.setHorizontalHeaderLabels(["Name", "Size", "Ext", "State"])
+        self.treeModel = CatalogTreeModel(self)
+        self.treeProxy = TreeFilterProxyModel(self)
+        self.treeProxy.setSourceModel(self.treeModel)
         self.treeView = QtWidgets.QTreeView()
-        self.treeView.setModel(self.treeModel)
+        self.treeView.setModel(self.treeProxy)
         self.treeView.setSortingEnabled(True)
         self.treeView.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
         self.treeView.doubleClicked.connect(self._handle_tree_double_click)
@@ -394,10 +754,16 @@ class FileExplorerWidget(QtWidgets.QWidget):
         self.statusLabel = QtWidgets.QLabel("Ready")
         layout.addWidget(self.statusLabel)
 
+        # Coalesce keystrokes: each filter change costs a COUNT plus a LIKE
+        # page query, so wait until typing pauses
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(250)
+        self._filter_timer.timeout.connect(self._apply_filter)
         self.filterEdit.textChanged.connect(self._on_filter_text)
         self.stateCombo.currentTextChanged.connect(self._on_state_change)
         self.viewToggle.idToggled.connect(self._on_view_toggled)
-        self.refreshBtn.clicked.connect(self.refresh_data)
+        self.refreshBtn.clicked.connect(self._reload)
         
         # Connect pagination controls
         self.pageSizeCombo.currentTextChanged.connect(self._on_page_size_changed)
@@ -423,23 +789,29 @@ class FileExplorerWidget(QtWidgets.QWidget):
 
     def mark_stale(self) -> None:
         self._needs_reload = True
+        self._count_cache.clear()
+        self._tree_dirty = True
+
+    def _reload(self) -> None:
+        self._tree_dirty = True
+        self.refresh_data()
 
     def ensure_loaded(self) -> None:
         db_path = self._db_path_provider()
-        # Only refresh if we really need to reload or path changed
-        if self._needs_reload or self._cached_db_path != db_path:
+        # Only refresh if we really need to reload, or the path or file changed
+        if self._needs_reload or self._cached_db_path != db_path or self._cached_db_token != db_change_token(db_path):
             # Don't reload if we're already loading
             if not self._loading:
                 self.refresh_data()
         else:
             # Data is already current for this path - no action needed
-            print(f"📋 Data already loaded for {db_path} - skipping reload")
+            logger.debug("Data already loaded for %s - skipping reload", db_path)
 
     def refresh_data(self) -> None:
         db_path = self._db_path_provider()
         self._requested_db_path = db_path
         if not db_path.exists():
-            print(f"🔍 DEBUG: Database not found: {db_path}")
+            logger.debug("Database not found: %s", db_path)
             self._rows = []
             self._total_rows = 0
             self._update_models([])
@@ -449,174 +821,279 @@ class FileExplorerWidget(QtWidgets.QWidget):
             self._cached_db_path = None
             return
         if self._loading:
-            print(f"🔍 DEBUG: Already loading, _loading={self._loading}")
-            if self._active_db_path is not None and self._active_db_path != db_path:
-                print(f"🔍 DEBUG: Setting pending reload")
-                self._pending_reload = True
+            logger.debug("Already loading, _loading=%s", self._loading)
+            # Path, page, sort or filters changed mid-load; reload once it lands
+            self._pending_reload = True
             return
-        print(f"🔍 DEBUG: Starting load...")
-        
-        # Set loading state to prevent multiple simultaneous loads
-        self._loading = True
-        self._active_db_path = db_path
-        self._needs_reload = False
-        
-        # Get current filter settings
-        filter_text = self.filterEdit.text().strip().lower()
-        state_filter = self.stateCombo.currentText()
-        
-        # Use synchronous loading (workaround for threading callback issue)
-        try:
-            rows, total_count = self._fetch_rows(db_path, self._current_page, self._page_size, filter_text, state_filter, self._sort_column, self._sort_ascending)
-            self._handle_future_success(db_path, rows, total_count)
-        except Exception as e:
-            print(f"❌ Failed to load data: {e}")
-            self._handle_future_failure(db_path, str(e))
+        logger.debug("Starting load...")
         
-        # Keep the async version for comparison
-        # self._start_load(db_path)
+        self._start_load(db_path)
 
     def _start_load(self, db_path: Path) -> None:
         if self._executor is None:
-            print("🔍 DEBUG: _start_load: executor is None!")
+            logger.debug("_start_load: executor is None!")
             return
-        print(f"🔍 DEBUG: _start_load: Setting up load for {db_path}")
+        logger.debug("_start_load: Setting up load for %s", db_path)
         self._loading = True
         self._pending_reload = False
         self._needs_reload = False
         self._active_db_path = Path(db_path)
         self.statusLabel.setText(f"Loading files from {db_path}...")
-        print(f"🔍 DEBUG: _start_load: Submitting _fetch_rows to executor")
-        future = self._executor.submit(self._fetch_rows, Path(db_path))
+        filter_text = self.filterEdit.text().strip().lower()
+        state_filter = self.stateCombo.currentText()
+        query_key = (
+            db_change_token(Path(db_path)),
+            filter_text,
+            state_filter,
+            self._sort_column,
+            self._sort_ascending,
+            self._page_size,
+        )
+        if query_key != self._page_bounds_key:
+            if self._page_bounds_key is None or query_key[0] != self._page_bounds_key[0]:
+                # The file changed, so every cached count is stale
+                self._count_cache.clear()
+            self._page_bounds = {}
+            self._page_bounds_key = query_key
+        self._loading_page = self._current_page
+        future = self._executor.submit(
+            self._fetch_page,
+            Path(db_path),
+            self._current_page,
+            self._page_size,
+            filter_text,
+            state_filter,
+            self._sort_column,
+            self._sort_ascending,
+            *self._page_anchor(),
+            self._count_cache.get(query_key[:3]),
+        )
         self._current_future = future
-        print(f"🔍 DEBUG: _start_load: Adding done_callback to future")
         callback = partial(self._on_future_done, Path(db_path))
         future.add_done_callback(callback)
-        print(f"🔍 DEBUG: _start_load: Future setup complete")
+
+    def _page_anchor(self) -> tuple[Optional[tuple], Optional[tuple], int]:
+        """Choose how to reach the current page: (after, before, from_end)."""
+        page = self._current_page
+        if page == 1 or self._sort_column not in KEYSET_SORT_COLUMNS:
+            return None, None, 0
+        previous = self._page_bounds.get(page - 1)
+        if previous is not None:
+            return previous[1], None, 0
+        following = self._page_bounds.get(page + 1)
+        if following is not None:
+            return None, following[0], 0
+        # _total_rows only belongs to this query once one of its pages loaded
+        if self._page_bounds and self._page_size > 0:
+            last_page = (self._total_rows + self._page_size - 1) // self._page_size
+            if page == last_page:
+                return None, None, self._total_rows - (page - 1) * self._page_size
+        return None, None, 0
+
+    @classmethod
+    def _fetch_page(cls, db_path: Path, *args: Any) -> tuple[List[Any], int, List[str]]:
+        """Worker-thread load: one page of rows, the total count and the state list.
+
+        Everything runs in one read transaction on the worker's cached
+        connection, so a scan committing mid-load cannot leave the count,
+        page and state list disagreeing. The state list also serves the
+        filter, so it is read once per load.
+        """
+        with read_snapshot(db_path):
+            states = cls._fetch_states(db_path)
+            rows, total_count = cls._fetch_rows(db_path, *args, states=states)
+        return rows, total_count, states
+
+    @staticmethod
+    def _fetch_states(db_path: Path) -> List[str]:
+        # Loose index scan: each step seeks idx_files_state for the next larger
+        # state, so this reads one index entry per distinct state where
+        # SELECT DISTINCT would walk every row's entry
+        con = read_connection(db_path)
+        cur = con.execute(
+            """
+            WITH RECURSIVE s(state) AS (
+                SELECT MIN(state) FROM files
+                UNION ALL
+                SELECT (SELECT MIN(state) FROM files WHERE state > s.state) FROM s WHERE s.state IS NOT NULL
+            )
+            SELECT state FROM s WHERE state IS NOT NULL
+            """
+        )
+        return [row[0] for row in cur.fetchall()]
 
     @staticmethod
-    def _fetch_rows(db_path: Path, page: int = 1, page_size: int = 100, filter_text: str = "", state_filter: str = "All", sort_column: str = "path_abs", sort_ascending: bool = True) -> tuple[List[Any], int]:
-        """Fetch a page of rows from the database along with the total count."""
-        print(f"🔍 DEBUG: _fetch_rows called with db_path: {db_path}, page: {page}, page_size: {page_size}, sort: {sort_column} {'ASC' if sort_ascending else 'DESC'}")
+    def _filter_conditions(con: sqlite3.Connection, db_path: Path, filter_text: str, state_filter: str, states: Optional[Sequence[str]] = None) -> tuple[List[str], List[Any]]:
+        """WHERE terms and parameters for the state combo and the filter box.
+
+        ``states`` is the distinct state list when the caller already has it.
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if state_filter and state_filter != "All":
+            conditions.append("state = ?")
+            params.append(state_filter)
+        if not filter_text:
+            return conditions, params
+        if len(filter_text) >= 3 and has_files_fts(con):
+            # A trigram phrase is a substring match answered from files_fts.
+            # name and ext are part of path_abs; error_msg is not indexed but
+            # only error/missing rows carry one, reached via idx_files_state_code,
+            # and the few distinct states are matched here so idx_files_state
+            # can serve them
+            phrase = '"' + filter_text.replace('"', '""') + '"'
+            terms = [
+                "file_id IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?)",
+                "(state_code >= 8 AND error_msg LIKE ?)",
+            ]
+            params.extend([phrase, f"%{filter_text}%"])
+            if states is None:
+                states = FileExplorerWidget._fetch_states(db_path)
+            matching = [s for s in states if filter_text in s.lower()]
+            if matching:
+                terms.append(f"state IN ({', '.join('?' * len(matching))})")
+                params.extend(matching)
+            conditions.append("(" + " OR ".join(terms) + ")")
+            return conditions, params
+        # Too short for trigrams, or a catalog without files_fts
+        filter_like = f"%{filter_text}%"
+        conditions.append(
+            "(path_abs LIKE ? OR name LIKE ? OR ext LIKE ? OR state LIKE ? OR error_msg LIKE ?)"
+        )
+        params.extend([filter_like] * 5)
+        return conditions, params
+
+    @staticmethod
+    def _fetch_rows(db_path: Path, page: int = 1, page_size: int = 100, filter_text: str = "", state_filter: str = "All", sort_column: str = "path_abs", sort_ascending: bool = True, after: Optional[tuple] = None, before: Optional[tuple] = None, from_end: int = 0, total_count: Optional[int] = None, states: Optional[Sequence[str]] = None) -> tuple[List[Any], int]:
+        """Fetch a page of rows from the database along with the total count.
+
+        ``after``/``before`` are the (sort value, file_id) just outside the
+        page, letting the index seek straight to it; ``from_end`` loads the
+        last page as the final ``from_end`` rows. Without either the page is
+        reached with OFFSET. A known ``total_count`` skips the COUNT query,
+        and ``states`` spares the filter re-reading the state list.
+        """
+        if sort_column not in FileExplorerWidget._SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_column!r}")
+        logger.debug("_fetch_rows called with db_path: %s, page: %s, page_size: %s, sort: %s %s", db_path, page, page_size, sort_column, 'ASC' if sort_ascending else 'DESC')
         
-        with sqlite3.connect(str(db_path)) as con:
-            con.row_factory = sqlite3.Row
-            cur = con.cursor()
-            
-            # Build WHERE clause based on filters
-            where_conditions = []
-            params = []
-            
-            if state_filter and state_filter != "All":
-                where_conditions.append("state = ?")
-                params.append(state_filter)
-            
-            if filter_text:
-                filter_like = f"%{filter_text}%"
-                where_conditions.append(
-                    "(path_abs LIKE ? OR name LIKE ? OR ext LIKE ? OR state LIKE ? OR error_msg LIKE ?)"
-                )
-                params.extend([filter_like] * 5)
-            
-            where_clause = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-            
-            # Get total count with filters applied
+        con = read_connection(db_path)
+        con.row_factory = sqlite3.Row
+        cur = con.cursor()
+        
+        # Build WHERE clause based on filters
+        where_conditions, params = FileExplorerWidget._filter_conditions(con, db_path, filter_text, state_filter, states)
+        
+        where_clause = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        
+        # Get total count with filters applied
+        if total_count is None:
             count_query = f"SELECT COUNT(*) FROM files{where_clause}"
             cur.execute(count_query, params)
             total_count = cur.fetchone()[0]
-            print(f"🔍 DEBUG: Total count with filters: {total_count}")
-            
-            # Build ORDER BY clause
-            sort_direction = "ASC" if sort_ascending else "DESC"
-            order_by_clause = f"ORDER BY {sort_column} {sort_direction}"
-            
-            # Fetch the page of data
-            offset = (page - 1) * page_size
-            data_query = f"""
-                SELECT file_id, path_abs, dir, name, ext, size_bytes, mtime_utc, ctime_utc, state, error_msg 
-                FROM files
-                {where_clause}
-                {order_by_clause}
-                LIMIT ? OFFSET ?
-            """
-            cur.execute(data_query, params + [page_size, offset])
-            rows = cur.fetchall()
-            print(f"🔍 DEBUG: _fetch_rows fetched {len(rows)} rows from database (offset={offset})")
-            if rows:
-                print(f"🔍 DEBUG: First row sample: {dict(rows[0])}")
-            
-            return rows, total_count
+        logger.debug("Total count with filters: %s", total_count)
+        
+        # file_id breaks ties so every row has exactly one place in the
+        # order and a page edge can be resumed from
+        reverse = before is not None or from_end > 0
+        if after is not None or before is not None:
+            forward = (after is not None) == sort_ascending
+            where_conditions.append(f"({sort_column}, file_id) {'>' if forward else '<'} (?, ?)")
+            params.extend(after if after is not None else before)
+            where_clause = " WHERE " + " AND ".join(where_conditions)
+        
+        # Build ORDER BY clause; pages before an anchor or at the end are
+        # read backwards from it and flipped afterwards
+        sort_direction = "ASC" if sort_ascending != reverse else "DESC"
+        order_by_clause = f"ORDER BY {sort_column} {sort_direction}, file_id {sort_direction}"
+        
+        # Fetch the page of data
+        offset = 0 if after is not None or reverse else (page - 1) * page_size
+        data_query = f"""
+            SELECT file_id, path_abs, dir, name, ext, size_bytes, mtime_utc, ctime_utc, state, error_msg 
+            FROM files
+            {where_clause}
+            {order_by_clause}
+            LIMIT ? OFFSET ?
+        """
+        cur.execute(data_query, params + [from_end or page_size, offset])
+        rows = cur.fetchall()
+        if reverse:
+            rows.reverse()
+        logger.debug("_fetch_rows fetched %s rows from database (offset=%s)", len(rows), offset)
+        
+        return rows, total_count
     
     @staticmethod
     def _fetch_all_rows(db_path: Path, filter_text: str = "", state_filter: str = "All", limit: int = 50000) -> List[Any]:
         """Fetch all rows matching filters (up to limit) for tree view - no pagination."""
-        print(f"🔍 DEBUG: _fetch_all_rows called with db_path: {db_path}, limit: {limit}")
+        logger.debug("_fetch_all_rows called with db_path: %s, limit: %s", db_path, limit)
         
-        with sqlite3.connect(str(db_path)) as con:
-            con.row_factory = sqlite3.Row
-            cur = con.cursor()
-            
-            # Build WHERE clause based on filters
-            where_conditions = []
-            params = []
-            
-            if state_filter and state_filter != "All":
-                where_conditions.append("state = ?")
-                params.append(state_filter)
-            
-            if filter_text:
-                filter_like = f"%{filter_text}%"
-                where_conditions.append(
-                    "(path_abs LIKE ? OR name LIKE ? OR ext LIKE ? OR state LIKE ? OR error_msg LIKE ?)"
-                )
-                params.extend([filter_like] * 5)
-            
-            where_clause = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-            
-            # Fetch all matching data (with limit for performance)
-            data_query = f"""
-                SELECT file_id, path_abs, dir, name, ext, size_bytes, mtime_utc, ctime_utc, state, error_msg 
-                FROM files
-                {where_clause}
-                ORDER BY path_abs
-                LIMIT ?
-            """
-            cur.execute(data_query, params + [limit])
-            rows = cur.fetchall()
-            print(f"🔍 DEBUG: _fetch_all_rows fetched {len(rows)} rows from database")
-            
-            return rows
+        con = read_connection(db_path)
+        con.row_factory = sqlite3.Row
+        cur = con.cursor()
+        
+        # Build WHERE clause based on filters
+        where_conditions, params = FileExplorerWidget._filter_conditions(con, db_path, filter_text, state_filter)
+        
+        where_clause = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+        
+        # Fetch all matching data (with limit for performance)
+        data_query = f"""
+            SELECT file_id, path_abs, dir, name, ext, size_bytes, mtime_utc, ctime_utc, state, error_msg 
+            FROM files
+            {where_clause}
+            ORDER BY path_abs
+            LIMIT ?
+        """
+        cur.execute(data_query, params + [limit])
+        rows = cur.fetchall()
+        logger.debug("_fetch_all_rows fetched %s rows from database", len(rows))
+        
+        return rows
 
     def _on_future_done(self, path: Path, future: Future) -> None:
-        print(f"🔍 DEBUG: _on_future_done called! path={path}")
+        logger.debug("_on_future_done called! path=%s", path)
+        if future.cancelled():
+            return
         try:
-            rows = future.result()
-            print(f"🔍 DEBUG: Future completed successfully with {len(rows)} rows")
+            rows, total_count, states = future.result()
+            logger.debug("Future completed successfully with %s rows", len(rows))
         except Exception as exc:
-            print(f"🔍 DEBUG: Future failed with exception: {exc}")
-            QtCore.QTimer.singleShot(0, lambda: self._handle_future_failure(path, str(exc)))
+            logger.debug("Future failed with exception: %s", exc)
+            self._pageFailed.emit(path, str(exc))
         else:
-            print(f"🔍 DEBUG: Scheduling _handle_future_success via QTimer")
-            QtCore.QTimer.singleShot(0, lambda: self._handle_future_success(path, rows))
+            # Runs on the worker thread: hand the result to the GUI thread via
+            # a queued signal (a QTimer started here would never fire)
+            self._pageLoaded.emit(path, rows, total_count, states)
 
-    def _handle_future_success(self, path: Path, rows: Sequence[Any], total_count: int = 0) -> None:
-        print(f"🔍 DEBUG: _handle_future_success called with {len(rows)} rows, total_count={total_count}")
+    def _handle_future_success(self, path: Path, rows: Sequence[Any], total_count: int = 0, states: Optional[List[str]] = None) -> None:
+        logger.debug("_handle_future_success called with %s rows, total_count=%s", len(rows), total_count)
         self._current_future = None
         # Check if path still matches what was requested
         if self._requested_db_path != path:
-            print(f"🔍 DEBUG: Path mismatch! Requested: {self._requested_db_path}, Got: {path}")
+            logger.debug("Path mismatch! Requested: %s, Got: %s", self._requested_db_path, path)
             self._finish_loading()
             return
         self._rows = list(rows)
         self._total_rows = total_count
-        print(f"🔍 DEBUG: Set self._rows to {len(self._rows)} rows, total_rows={self._total_rows}")
+        if self._page_bounds_key is not None:
+            self._count_cache[self._page_bounds_key[:3]] = total_count
+        if self._rows and self._page_bounds_key is not None:
+            sort_column = self._page_bounds_key[3]
+            first, last = self._rows[0], self._rows[-1]
+            self._page_bounds[self._loading_page] = (
+                (first[sort_column], first["file_id"]),
+                (last[sort_column], last["file_id"]),
+            )
+        logger.debug("Set self._rows to %s rows, total_rows=%s", len(self._rows), self._total_rows)
         self._cached_db_path = path
+        self._cached_db_token = db_change_token(path)
         self._needs_reload = False  # Clear reload flag since we just loaded successfully
-        self._update_state_options_from_db(path)
-        print(f"🔍 DEBUG: About to call _update_models with {len(self._rows)} rows")
+        if states is not None:
+            self._set_state_options(states)
         self._update_models(self._rows)
         self._update_pagination_controls()
-        print(f"🔍 DEBUG: Called _update_models, setting status label")
         
         # Calculate display range
         start_idx = (self._current_page - 1) * self._page_size + 1
@@ -649,100 +1126,38 @@ class FileExplorerWidget(QtWidgets.QWidget):
             future.cancel()
         self._current_future = None
         if self._executor is not None:
+            # The connection belongs to the worker thread, so close it there
+            self._executor.submit(close_read_connection)
             self._executor.shutdown(wait=True)
             self._executor = None
         self._loading = False
         self._active_db_path = None
 
-    def _update_state_options_from_db(self, db_path: Path) -> None:
-        """Query database for distinct states instead of scanning loaded rows."""
-        try:
-            with sqlite3.connect(str(db_path)) as con:
-                cur = con.cursor()
-                cur.execute("SELECT DISTINCT state FROM files WHERE state IS NOT NULL ORDER BY state")
-                states = [row[0] for row in cur.fetchall()]
-            
-            current = self.stateCombo.currentText()
-            self.stateCombo.blockSignals(True)
-            self.stateCombo.clear()
-            self.stateCombo.addItem("All")
-            for state in states:
-                self.stateCombo.addItem(state)
-            if current and self.stateCombo.findText(current) >= 0:
-                self.stateCombo.setCurrentText(current)
-            self.stateCombo.blockSignals(False)
-        except Exception as e:
-            print(f"⚠️ Failed to update state options: {e}")
+    def _set_state_options(self, states: Sequence[str]) -> None:
+        current = self.stateCombo.currentText()
+        self.stateCombo.blockSignals(True)
+        self.stateCombo.clear()
+        self.stateCombo.addItem("All")
+        for state in states:
+            self.stateCombo.addItem(state)
+        if current and self.stateCombo.findText(current) >= 0:
+            self.stateCombo.setCurrentText(current)
+        self.stateCombo.blockSignals(False)
 
     def _update_models(self, rows: Sequence[Any]) -> None:
-        print(f"🔍 DEBUG: _update_models called with {len(rows)} rows")
-        print(f"🔍 DEBUG: About to call tableModel.set_rows")
+        logger.debug("_update_models called with %s rows", len(rows))
         self.tableModel.set_rows(rows)
-        print(f"🔍 DEBUG: Called tableModel.set_rows")
-        # No need to invalidate proxy filter - we're doing server-side filtering now
-        self._tree_dirty = True
+        # Rows are updated in place now, so drop a selection that would
+        # otherwise stay on the same positions of the new page
+        self.tableView.clearSelection()
+        # No need to invalidate proxy filter - we're doing server-side filtering now.
+        # Paging and sorting only affect the table; the tree is rebuilt when stale.
         self._maybe_rebuild_tree()
-        print(f"🔍 DEBUG: _update_models complete")
-
-    def _rebuild_tree(self, rows: Sequence[Any]) -> None:
-        self.treeModel.removeRows(0, self.treeModel.rowCount())
-        root = self.treeModel.invisibleRootItem()
-        nodes: Dict[str, QtGui.QStandardItem] = {}
-        parts_cache: Dict[str, Sequence[str]] = {}
-
-        def ensure_directory(path_str: str) -> QtGui.QStandardItem:
-            if not path_str:
-                return root
-            existing = nodes.get(path_str)
-            if existing is not None:
-                return existing
-            parts = parts_cache.get(path_str)
-            if parts is None:
-                parts_cache[path_str] = parts = Path(path_str).parts
-            parent = root
-            current_path = ""
-            for part in parts:
-                current_path = part if not current_path else os.path.join(current_path, part)
-                node = nodes.get(current_path)
-                if node is None:
-                    items = self._create_dir_items(part, current_path)
-                    parent.appendRow(items)
-                    node = items[0]
-                    nodes[current_path] = node
-                parent = node
-            nodes[path_str] = parent
-            return parent
-
-        truncated = False
-        limit = self._tree_row_limit
-
-        for idx, row in enumerate(rows):
-            if limit and idx >= limit:
-                truncated = True
-                break
-            dir_path = row_get(row, "dir", "")
-            parent_item = ensure_directory(dir_path if isinstance(dir_path, str) else "")
-            file_items = self._create_file_items(row)
-            parent_item.appendRow(file_items)
-
-        self.treeView.expandToDepth(0)
-        
-        # Update tooltip to explain tree view shows all matching data
-        if truncated:
-            self.treeView.setToolTip(
-                f"Tree view truncated to first {limit:,} entries (of {len(rows):,} matching). "
-                f"Apply filters to narrow results. Tree shows ALL matching files, not just current page."
-            )
-        else:
-            self.treeView.setToolTip(
-                f"Tree view shows all {len(rows):,} matching entries. "
-                f"Table view shows page {self._current_page} of paginated results."
-            )
 
     def _maybe_rebuild_tree(self) -> None:
         if self.stack.currentWidget() is not self.treeView:
             return
-        if not self._tree_dirty:
+        if not self._tree_dirty or self._tree_building or self._executor is None:
             return
         
         # Tree view shows ALL matching rows (not paginated)
@@ -751,60 +1166,96 @@ class FileExplorerWidget(QtWidgets.QWidget):
             self._tree_dirty = False
             return
         
+        self._tree_dirty = False
+        self._tree_building = True
+        self._tree_request += 1
+        request = self._tree_request
+        future = self._executor.submit(
+            self._build_tree,
+            db_path,
+            self.filterEdit.text().strip().lower(),
+            self.stateCombo.currentText(),
+            self._tree_row_limit,
+        )
+        future.add_done_callback(partial(self._on_tree_future_done, request))
+
+    @classmethod
+    def _build_tree(cls, db_path: Path, filter_text: str, state_filter: str, limit: int) -> tuple[TreeNodes, bool, bool, int]:
+        """Worker-thread tree build: (nodes, truncated, complete, row count)."""
+        # The size probe and the fetch share a snapshot, so "complete" holds
+        # for the rows actually fetched
+        with read_snapshot(db_path) as con:
+            capped = con.execute("SELECT COUNT(*) FROM (SELECT 1 FROM files LIMIT ?)", (limit + 1,)).fetchone()[0]
+            complete = capped <= limit
+            if complete:
+                # Whole catalog fits: build it once and filter through the proxy
+                rows = cls._fetch_all_rows(db_path, "", "All", limit)
+            else:
+                # Fetch all matching rows for tree (up to limit)
+                rows = cls._fetch_all_rows(db_path, filter_text, state_filter, limit)
+        nodes, truncated = TreeNodes.build(rows, limit)
+        return nodes, truncated, complete, len(rows)
+
+    def _on_tree_future_done(self, request: int, future: Future) -> None:
+        if future.cancelled():
+            return
         try:
-            filter_text = self.filterEdit.text().strip().lower()
-            state_filter = self.stateCombo.currentText()
-            # Fetch all matching rows for tree (up to limit)
-            all_rows = self._fetch_all_rows(db_path, filter_text, state_filter, self._tree_row_limit)
-            self._rebuild_tree(all_rows)
-            self._tree_dirty = False
-        except Exception as e:
-            print(f"❌ Failed to build tree: {e}")
-            self._tree_dirty = False
+            result = future.result()
+        except Exception as exc:
+            self._treeFailed.emit(request, str(exc))
+        else:
+            # Worker thread: the model may only be touched on the GUI thread
+            self._treeBuilt.emit(request, result)
+
+    def _on_tree_built(self, request: int, result: tuple[TreeNodes, bool, bool, int]) -> None:
+        self._tree_building = False
+        if request == self._tree_request:
+            nodes, truncated, complete, row_count = result
+            self._tree_complete = complete
+            self.treeModel.set_nodes(nodes)
+            self.treeView.expandToDepth(0)
+            
+            # Update tooltip to explain tree view shows all matching data
+            limit = self._tree_row_limit
+            if truncated:
+                self.treeView.setToolTip(
+                    f"Tree view truncated to first {limit:,} entries (of {row_count:,} matching). "
+                    f"Apply filters to narrow results. Tree shows ALL matching files, not just current page."
+                )
+            else:
+                self.treeView.setToolTip(
+                    f"Tree view shows all {row_count:,} matching entries. "
+                    f"Table view shows page {self._current_page} of paginated results."
+                )
+            self._apply_tree_filter()
+        # Filters or data changed while this tree was being built
+        self._maybe_rebuild_tree()
+
+    def _on_tree_failed(self, request: int, error: str) -> None:
+        self._tree_building = False
+        logger.warning("Failed to build tree: %s", error)
+        self._maybe_rebuild_tree()
 
-    def _create_dir_items(self, name: str, full_path: str) -> List[QtGui.QStandardItem]:
-        name_item = QtGui.QStandardItem(name)
-        name_item.setEditable(False)
-        name_item.setData(full_path, FILE_PATH_ROLE)
-        name_item.setData(True, IS_DIRECTORY_ROLE)
-        size_item = QtGui.QStandardItem("")
-        size_item.setEditable(False)
-        ext_item = QtGui.QStandardItem("")
-        ext_item.setEditable(False)
-        state_item = QtGui.QStandardItem("")
-        state_item.setEditable(False)
-        return [name_item, size_item, ext_item, state_item]
-
-    def _create_file_items(self, row: Any) -> List[QtGui.QStandardItem]:
-        name_item = QtGui.QStandardItem(row_get(row, "name") or "")
-        name_item.setEditable(False)
-        name_item.setData(row_get(row, "path_abs"), FILE_PATH_ROLE)
-        name_item.setData(False, IS_DIRECTORY_ROLE)
-        name_item.setData(row, ROW_DATA_ROLE)
-
-        size_item = QtGui.QStandardItem(format_bytes(row_get(row, "size_bytes")))
-        size_item.setEditable(False)
-        size_item.setData(row_get(row, "size_bytes") or 0, USER_ROLE)
-
-        ext_item = QtGui.QStandardItem(row_get(row, "ext") or "")
-        ext_item.setEditable(False)
-
-        state_item = QtGui.QStandardItem(row_get(row, "state") or "")
-        state_item.setEditable(False)
-
-        return [name_item, size_item, ext_item, state_item]
+    def _apply_tree_filter(self) -> None:
+        self.treeProxy.setFilterText(self.filterEdit.text())
+        self.treeProxy.setStateFilter(self.stateCombo.currentText())
 
     def _on_filter_text(self, text: str) -> None:
-        # Reset to page 1 when filter changes
-        self._current_page = 1
-        self.refresh_data()
-        self._tree_dirty = True
+        self._filter_timer.start()
 
     def _on_state_change(self, state: str) -> None:
-        # Reset to page 1 when state filter changes
+        # A combo pick is a single change; apply it (and any pending text) now
+        self._filter_timer.stop()
+        self._apply_filter()
+
+    def _apply_filter(self) -> None:
+        # Reset to page 1 when filters change
         self._current_page = 1
+        if self._tree_complete:
+            self._apply_tree_filter()
+        else:
+            self._tree_dirty = True
         self.refresh_data()
-        self._tree_dirty = True
     
     def _on_sort_changed(self, logical_index: int, order: Qt.SortOrder) -> None:
         """Handle table header sort changes - applies to entire database."""
@@ -823,7 +1274,7 @@ class FileExplorerWidget(QtWidgets.QWidget):
         if logical_index in column_map:
             self._sort_column = column_map[logical_index]
             self._sort_ascending = (order == Qt.SortOrder.AscendingOrder)
-            print(f"🔍 DEBUG: Sort changed to {self._sort_column} {'ASC' if self._sort_ascending else 'DESC'}")
+            logger.debug("Sort changed to %s %s", self._sort_column, 'ASC' if self._sort_ascending else 'DESC')
             # Don't reset to page 1 on sort - stay on current page
             self.refresh_data()
     
@@ -887,15 +1338,14 @@ class FileExplorerWidget(QtWidgets.QWidget):
     def _handle_table_double_click(self, index: QtCore.QModelIndex) -> None:
         if not index.isValid():
             return
-        source_index = self.proxyModel.mapToSource(index)
-        row = self.tableModel.raw_row(source_index.row())
+        row = self.tableModel.raw_row(index.row())
         self._open_path(row_get(row, "path_abs"))
 
     def _handle_tree_double_click(self, index: QtCore.QModelIndex) -> None:
         if not index.isValid():
             return
-        item = self.treeModel.itemFromIndex(index)
-        if not item:
+        item = self._tree_source_index(index)
+        if not item.isValid():
             return
         if item.data(IS_DIRECTORY_ROLE):
             if self.treeView.isExpanded(index):
@@ -906,14 +1356,16 @@ class FileExplorerWidget(QtWidgets.QWidget):
         path = item.data(FILE_PATH_ROLE)
         self._open_path(path)
 
+    def _tree_source_index(self, index: QtCore.QModelIndex) -> QModelIndex:
+        return self.treeProxy.mapToSource(index)
+
     def _show_table_context_menu(self, pos: QtCore.QPoint) -> None:
         index = self.tableView.indexAt(pos)
         # Allow menu even if click is on empty area, as long as there is a selection
         selected_indexes = self.tableView.selectionModel().selectedRows()
         path = None
         if index.isValid():
-            source_index = self.proxyModel.mapToSource(index)
-            row = self.tableModel.raw_row(source_index.row())
+            row = self.tableModel.raw_row(index.row())
             path = row_get(row, "path_abs")
         menu = QtWidgets.QMenu(self)
         open_action = menu.addAction("Open file")
@@ -935,8 +1387,8 @@ class FileExplorerWidget(QtWidgets.QWidget):
         index = self.treeView.indexAt(pos)
         if not index.isValid():
             return
-        item = self.treeModel.itemFromIndex(index)
-        if not item:
+        item = self._tree_source_index(index)
+        if not item.isValid():
             return
         path = item.data(FILE_PATH_ROLE)
         if not path:
@@ -1090,9 +1542,8 @@ class FileExplorerWidget(QtWidgets.QWidget):
             return
         ids: List[int] = []
         paths: List[str] = []
-        for proxy_index in sel:
-            source_index = self.proxyModel.mapToSource(proxy_index)
-            row = self.tableModel.raw_row(source_index.row())
+        for index in sel:
+            row = self.tableModel.raw_row(index.row())
             row_dict = row_as_dict(row)
             fid = row_get(row_dict, "file_id")
             p = row_get(row_dict, "path_abs") or ""
@@ -1112,8 +1563,8 @@ class FileExplorerWidget(QtWidgets.QWidget):
         for idx in sel:
             if idx.column() != 0:
                 continue
-            item = self.treeModel.itemFromIndex(idx)
-            if not item or item.data(IS_DIRECTORY_ROLE):
+            item = self._tree_source_index(idx)
+            if not item.isValid() or item.data(IS_DIRECTORY_ROLE):
                 continue
             row = item.data(ROW_DATA_ROLE)
             row_dict = row_as_dict(row)
@@ -1130,6 +1581,10 @@ class FileExplorerWidget(QtWidgets.QWidget):
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    # Emitted from the stats thread; delivered on the GUI thread
+    _statsReady = QtCore.Signal(object)
+    _statsFailed = QtCore.Signal(str)
+
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("Corpus Cataloger")
@@ -1194,6 +1649,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.logView = QtWidgets.QPlainTextEdit()
         self.logView.setReadOnly(True)
+        # Oldest lines are dropped so relayout cost stays bounded on long scans
+        self.logView.setMaximumBlockCount(10000)
 
         leftPane = QtWidgets.QWidget()
         leftPane.setMinimumWidth(320)
@@ -1219,13 +1676,26 @@ class MainWindow(QtWidgets.QMainWindow):
         self.dbEdit.editingFinished.connect(self._on_db_path_changed)
 
         self.timer = QtCore.QTimer(self)
+        # Stats queries run on their own thread so the GUI never waits on
+        # SQLite. The connection and data_version below belong to that thread.
+        self._stats_executor = ThreadPoolExecutor(max_workers=1)
+        self._stats_future: Optional[Future] = None
+        self._stats_force_pending = False
+        self._stats_con: Optional[sqlite3.Connection] = None
+        self._stats_con_key: Optional[tuple] = None
+        self._stats_version: Optional[int] = None
+        self._statsReady.connect(self._apply_stats)
+        self._statsFailed.connect(self._stats_failed)
         self.timer.timeout.connect(self.refresh_stats)
         self.timer.start(1500)
 
         self._config_path = Path("config/catalog.yaml")
+        # Parsed config file, reused until its mtime changes
+        self._config: Optional[CatalogConfig] = None
+        self._config_mtime: Optional[int] = None
         if self._config_path.exists():
             try:
-                cfg = load_config(self._config_path)
+                cfg = self._base_config()
                 if cfg.db and cfg.db.path:
                     self.dbEdit.setText(cfg.db.path)
                 if cfg.roots:
@@ -1235,61 +1705,139 @@ class MainWindow(QtWidgets.QMainWindow):
             except Exception:
                 pass
 
-        self._scan_thread: Optional[QtCore.QThread] = None
-        self._scan_worker: Optional[ScanWorker] = None
+        # One long-lived thread runs scans; it is reused rather than created
+        # and torn down per scan
+        self._scan_pool = QtCore.QThreadPool(self)
+        self._scan_pool.setMaxThreadCount(1)
+        self._scan_pool.setExpiryTimeout(-1)
+        # Signals of the running scan, held so they outlive the runnable
+        self._scan_signals: Optional[ScanSignals] = None
+        # The running scan's progress slot, applied to the widgets every 50 ms
+        self._scan_progress: Optional[ScanProgress] = None
+        self._shown_progress: Optional[tuple[str, int, int, str]] = None
+        self._progress_timer = QtCore.QTimer(self)
+        self._progress_timer.setInterval(50)
+        self._progress_timer.timeout.connect(self._flush_progress)
+        # Scan log lines are appended here by the worker thread and moved to
+        # the view in one block every 200 ms
+        self._log_buffer: deque[str] = deque(maxlen=5000)
+        self._log_timer = QtCore.QTimer(self)
+        self._log_timer.setInterval(200)
+        self._log_timer.timeout.connect(self._flush_log)
 
         self.fileExplorer.mark_stale()
         self.fileExplorer.ensure_loaded()  # Initial data load
         self.refresh_stats()
 
-    def refresh_stats(self) -> None:
+    def refresh_stats(self, force: bool = False) -> None:
         db_path = self._current_db_path()
         explorer = getattr(self, "fileExplorer", None)
 
         if not db_path.exists():
+            self._stats_executor.submit(self._close_stats_connection)
             self.dbStats.setPlainText("DB not found. Run a scan from the CLI or start a new scan.")
             self.dbProgress.setRange(0, 0)
             if explorer:
                 explorer.mark_stale()
             return
 
+        if self._stats_future is not None and not self._stats_future.done():
+            # Timer ticks are dropped while a query runs; forced refreshes
+            # are replayed once it lands
+            self._stats_force_pending = self._stats_force_pending or force
+            return
+        future = self._stats_executor.submit(self._fetch_stats, db_path, force)
+        self._stats_future = future
+        future.add_done_callback(self._on_stats_done)
+        # Data loading handled separately by file explorer when needed
+
+    def _fetch_stats(self, db_path: Path, force: bool) -> Optional[tuple[int, int, int, int]]:
+        """Stats thread: read the counts, or None if nothing was committed since."""
         try:
-            with sqlite3.connect(str(db_path)) as con:
-                cur = con.cursor()
-                # Optimize: use single query with GROUP BY instead of 4 separate queries
-                cur.execute("""
-                    SELECT 
-                        COUNT(*) as total,
-                        SUM(CASE WHEN state='done' THEN 1 ELSE 0 END) as done,
-                        SUM(CASE WHEN state IN ('pending','quick_hashed','sha_pending') THEN 1 ELSE 0 END) as pending,
-                        SUM(CASE WHEN state='error' THEN 1 ELSE 0 END) as errors
-                    FROM files
-                """)
-                row = cur.fetchone()
-                total, done, pending, err = row if row else (0, 0, 0, 0)
+            con = self._stats_connection(db_path)
+            # data_version only moves when another connection commits, so the
+            # 1.5 s timer costs one pragma while the catalog is idle
+            version = con.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._stats_version and not force:
+                return None
+            # One pass over the state index; the handful of groups are
+            # folded into the displayed buckets here
+            counts = dict(con.execute("SELECT state, COUNT(*) FROM files GROUP BY state").fetchall())
+            self._stats_version = version
+        except Exception:
+            self._close_stats_connection()
+            raise
+        total = sum(counts.values())
+        done = counts.get("done", 0)
+        pending = sum(counts.get(state, 0) for state in ("pending", "quick_hashed", "sha_pending"))
+        err = counts.get("error", 0)
+        return total, done, pending, err
+
+    def _on_stats_done(self, future: Future) -> None:
+        # Stats thread: hand the outcome to the GUI thread
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            import traceback
+            self._statsFailed.emit(f"Error: {e}\n{traceback.format_exc()}")
+        else:
+            self._statsReady.emit(result)
 
+    def _apply_stats(self, result: Optional[tuple[int, int, int, int]]) -> None:
+        if result is not None:
+            total, done, pending, err = result
             self.dbStats.setPlainText(f"Total: {total}\nDone: {done}\nPending: {pending}\nErrors: {err}")
             if total > 0:
                 self.dbProgress.setRange(0, total)
                 self.dbProgress.setValue(done)
             else:
                 self.dbProgress.setRange(0, 0)
-        except Exception as e:
-            import traceback
-            error_msg = f"Error: {e}\n{traceback.format_exc()}"
-            self.dbStats.setPlainText(error_msg)
-            self.dbProgress.setRange(0, 0)
-            if explorer:
-                explorer.mark_stale()
-        # Data loading handled separately by file explorer when needed
+        self._replay_forced_stats()
+
+    def _stats_failed(self, error_msg: str) -> None:
+        self.dbStats.setPlainText(error_msg)
+        self.dbProgress.setRange(0, 0)
+        explorer = getattr(self, "fileExplorer", None)
+        if explorer:
+            explorer.mark_stale()
+        self._replay_forced_stats()
+
+    def _replay_forced_stats(self) -> None:
+        if self._stats_force_pending:
+            self._stats_force_pending = False
+            self.refresh_stats(force=True)
+
+    def _stats_connection(self, db_path: Path) -> sqlite3.Connection:
+        # Keyed on the file identity like read_connection(): a catalog deleted
+        # and recreated at the same path needs a new connection, since the old
+        # one's data_version would never move again
+        st = db_path.stat()
+        key = (str(db_path), st.st_dev, st.st_ino)
+        if self._stats_con is None or self._stats_con_key != key:
+            self._close_stats_connection()
+            self._stats_con = connect_readonly(db_path)
+            self._stats_con_key = key
+        return self._stats_con
+
+    def _close_stats_connection(self) -> None:
+        if self._stats_con is not None:
+            self._stats_con.close()
+        self._stats_con = None
+        self._stats_con_key = None
+        self._stats_version = None
 
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         self.fileExplorer.shutdown()
+        self.timer.stop()
+        self._stats_executor.submit(self._close_stats_connection)
+        self._stats_executor.shutdown(wait=True)
         super().closeEvent(event)
 
     def _refresh_all(self) -> None:
         self.fileExplorer.mark_stale()
-        self.refresh_stats()
+        self.refresh_stats(force=True)
 
     def _on_db_path_changed(self) -> None:
         self.fileExplorer.mark_stale()
@@ -1307,7 +1855,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.rootEdit.setText(directory)
 
     def _start_scan(self) -> None:
-        if self._scan_thread is not None:
+        if self._scan_signals is not None:
             return
 
         root_text = self.rootEdit.text().strip()
@@ -1324,6 +1872,16 @@ class MainWindow(QtWidgets.QMainWindow):
         if not db_path.parent.exists():
             db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        overrides = dict(
+            max_workers=self.workerSpin.value(),
+            io_chunk_bytes=self.chunkSpin.value() * 1024,
+        )
+        try:
+            cfg = self._scan_config(root_path, db_path, overrides)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Scan failed", f"Could not load {self._config_path}: {e}")
+            return
+
         self.fileExplorer.mark_stale()
 
         self.scanBtn.setEnabled(False)
@@ -1342,41 +1900,68 @@ class MainWindow(QtWidgets.QMainWindow):
             )
         )
 
+        self.logView.appendPlainText(
+            "[RUN] Effective scanner settings: max_workers=%s, chunk_bytes=%s"
+            % (cfg.scanner.max_workers, cfg.scanner.io_chunk_bytes)
+        )
+
         self.workerSpin.setEnabled(False)
         self.chunkSpin.setEnabled(False)
 
-        self._scan_thread = QtCore.QThread(self)
-        overrides = dict(
-            max_workers=self.workerSpin.value(),
-            io_chunk_bytes=self.chunkSpin.value() * 1024,
-        )
-        self._scan_worker = ScanWorker(
-            root_path=root_path,
-            db_path=db_path,
-            config_path=self._config_path,
-            overrides=overrides,
-        )
-        self._scan_worker.moveToThread(self._scan_thread)
-
-        self._scan_thread.started.connect(self._scan_worker.run)
-        self._scan_worker.progress.connect(self._handle_progress)
-        self._scan_worker.log.connect(self._handle_log)
-        self._scan_worker.finished.connect(self._scan_complete)
-        self._scan_worker.failed.connect(self._scan_failed)
+        worker = ScanWorker(root_path=root_path, config=cfg, log_buffer=self._log_buffer)
+        signals = self._scan_signals = worker.signals
+        self._scan_progress = worker.progress
+        signals.finished.connect(self._scan_complete, QUEUED_CONNECTION)
+        signals.failed.connect(self._scan_failed, QUEUED_CONNECTION)
+        signals.finished.connect(self._clear_worker, QUEUED_CONNECTION)
+        signals.failed.connect(self._clear_worker, QUEUED_CONNECTION)
+        self._scan_pool.start(worker)
+        self._progress_timer.start()
+        self._log_timer.start()
+
+    def _base_config(self) -> Optional[CatalogConfig]:
+        """The parsed config file, or None without one; re-read only when it changes."""
+        try:
+            mtime = self._config_path.stat().st_mtime_ns
+        except OSError:
+            self._config = self._config_mtime = None
+            return None
+        if self._config is None or mtime != self._config_mtime:
+            self._config = load_config(self._config_path)
+            self._config_mtime = mtime
+        return self._config
+
+    def _scan_config(self, root_path: Path, db_path: Path, overrides: Dict[str, int]) -> CatalogConfig:
+        """Resolve the config for one scan on the GUI thread.
+
+        Works on a deep copy so per-scan settings never leak into the cache.
+        """
+        base = self._base_config()
+        cfg = base.model_copy(deep=True) if base is not None else CatalogConfig(roots=[str(root_path)])
+        cfg.roots = [str(root_path)]
+        cfg.db.path = str(db_path)
+        for key, value in overrides.items():
+            if value is None:
+                continue
+            if hasattr(cfg.scanner, key):
+                setattr(cfg.scanner, key, value)
+        return cfg
 
-        self._scan_worker.finished.connect(self._scan_thread.quit)
-        self._scan_worker.failed.connect(self._scan_thread.quit)
-        self._scan_worker.finished.connect(self._scan_worker.deleteLater)
-        self._scan_worker.failed.connect(self._scan_worker.deleteLater)
-        self._scan_thread.finished.connect(self._clear_worker)
-        self._scan_thread.start()
+    def _stop_progress_updates(self) -> None:
+        self._progress_timer.stop()
+        self._scan_progress = None
+        self._shown_progress = None
+        self._log_timer.stop()
+        self._flush_log()
 
     @QtCore.Slot()
     def _clear_worker(self) -> None:
-        if self._scan_thread:
-            self._scan_thread.deleteLater()
-        self._scan_thread = None
-        self._scan_worker = None
+        # The single post-scan refresh point for both success and failure;
+        # runs once per scan even if both signals were to arrive
+        if self._scan_signals is None:
+            return
+        self._scan_signals = None
+        self._stop_progress_updates()
         self.scanBtn.setEnabled(True)
         self.rootEdit.setEnabled(True)
         self.browseBtn.setEnabled(True)
@@ -1384,8 +1969,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self.chunkSpin.setEnabled(True)
         self._refresh_all()
 
-    @QtCore.Slot(str, int, int, str)
-    def _handle_progress(self, stage: str, current: int, total: int, message: str) -> None:
+    @QtCore.Slot()
+    def _flush_progress(self) -> None:
+        slot = self._scan_progress
+        pending = slot.latest if slot is not None else None
+        if pending is None or pending is self._shown_progress:
+            return
+        self._shown_progress = pending
+        stage, current, total, message = pending
         if total <= 0:
             self.scanProgress.setRange(0, 0)
         else:
@@ -1393,26 +1984,33 @@ class MainWindow(QtWidgets.QMainWindow):
             self.scanProgress.setValue(current)
         self.scanStatus.setText(message or stage.capitalize())
 
-    @QtCore.Slot(str)
-    def _handle_log(self, message: str) -> None:
-        self.logView.appendPlainText(message)
+    @QtCore.Slot()
+    def _flush_log(self) -> None:
+        buf = self._log_buffer
+        lines = []
+        # popleft rather than clear(): the worker may append concurrently
+        while buf:
+            lines.append(buf.popleft())
+        if lines:
+            self.logView.appendPlainText("\n".join(lines))
 
     @QtCore.Slot()
     def _scan_complete(self) -> None:
+        self._stop_progress_updates()
         self.scanStatus.setText("Scan complete")
         self.scanProgress.setRange(0, 1)
         self.scanProgress.setValue(1)
         self.logView.appendPlainText("[DONE] Scan complete")
-        self._refresh_all()
-        QtWidgets.QMessageBox.information(self, "Scan complete", "Scanning finished successfully.")
+        # Non-modal, so the post-scan refresh is not held behind a dialog
+        self.statusBar().showMessage("Scanning finished successfully.", 5000)
 
     @QtCore.Slot(str)
     def _scan_failed(self, error: str) -> None:
+        self._stop_progress_updates()
         self.scanStatus.setText("Scan failed")
         self.scanProgress.setRange(0, 1)
         self.scanProgress.setValue(0)
         self.logView.appendPlainText(f"[ERROR] {error}")
-        self._refresh_all()
         QtWidgets.QMessageBox.critical(self, "Scan failed", error)
 
 
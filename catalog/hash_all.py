@@ -8,7 +8,7 @@ from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from .config import CatalogConfig
 from .db import connect, migrate
-from .util import blake3_file
+from .util import align_chunk_size, blake3_file, compile_path_filter, feed_file
 
 try:
     import blake3  # noqa: F401
@@ -67,23 +67,8 @@ class ByteRateLimiter:
 
 
 def path_filter_sql(include: Sequence[str], exclude: Sequence[str], alias: str = "f") -> Tuple[str, List[str]]:
-    clauses: List[str] = []
-    params: List[str] = []
-    if include:
-        ors = []
-        for prefix in include:
-            ors.append(f"{alias}.path_abs LIKE ?")
-            params.append(prefix.rstrip('\\/') + '%')
-        clauses.append('(' + ' OR '.join(ors) + ')')
-    if exclude:
-        ors = []
-        for prefix in exclude:
-            ors.append(f"{alias}.path_abs LIKE ?")
-            params.append(prefix.rstrip('\\/') + '%')
-        clauses.append('NOT (' + ' OR '.join(ors) + ')')
-    if clauses:
-        return ' AND ' + ' AND '.join(clauses) + ' ', params
-    return '', params
+    sql, params = compile_path_filter(tuple(include), tuple(exclude), alias)
+    return sql, list(params)
 
 
 def _emit(cb: Optional[Callable[..., None]], *args, **kwargs) -> None:
@@ -113,7 +98,7 @@ def hash_all_blake3(
     include_prefixes = tuple(include_prefixes or [])
     exclude_prefixes = tuple(exclude_prefixes or [])
     workers = max_workers or cfg.dedupe.max_workers or cfg.scanner.max_workers
-    chunk_size = chunk_bytes or cfg.dedupe.sha_chunk_bytes
+    chunk_size = align_chunk_size(chunk_bytes or cfg.dedupe.sha_chunk_bytes)
 
     limiter: Optional[ByteRateLimiter] = None
     if io_bytes_per_sec and io_bytes_per_sec > 0:
@@ -140,7 +125,7 @@ def hash_all_blake3(
     try:
         cur = con.cursor()
         filt_sql, filt_params = path_filter_sql(include_prefixes, exclude_prefixes)
-        where_clauses = ["f.state NOT IN ('error', 'missing')"]
+        where_clauses = ["f.state_code < 8"]
         params: List[object] = list(filt_params)
         if not force:
             where_clauses.append("(f.blake3 IS NULL OR f.blake3 = '')")
@@ -243,13 +228,7 @@ def hash_all_blake3(
             except Exception as exc:
                 raise RuntimeError("The 'blake3' package is required to hash files") from exc
             hasher = blake3.blake3()
-            with path.open('rb', buffering=1024 * 64) as fh:
-                while True:
-                    chunk = fh.read(chunk_size)
-                    if not chunk:
-                        break
-                    limiter_obj.acquire(len(chunk))
-                    hasher.update(chunk)
+            feed_file(hasher, path, chunk_size, limiter_obj.acquire)
             return hasher.hexdigest()
 
         with ThreadPoolExecutor(max_workers=workers) as executor:
@@ -8,7 +8,7 @@ import sqlite3
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .config import CatalogConfig
-from .db import connect, migrate
+from .db import connect, has_files_fts, index_new_files, migrate
 
 def utc(ts: float) -> str:
     return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
@@ -91,6 +91,7 @@ def scan_root(root: str, cfg: CatalogConfig, progress_cb: Optional[ProgressCallb
     try:
         migrate(con)
         cur = con.cursor()
+        fts = has_files_fts(con)
 
         cur.execute(
             "INSERT INTO scans(started_at, root_path, host, user) VALUES (?,?,?,?)",
@@ -194,6 +195,9 @@ def scan_root(root: str, cfg: CatalogConfig, progress_cb: Optional[ProgressCallb
         def insert_batch(rows: List[Dict]):
             if not rows:
                 return
+            if fts:
+                cur.execute("SELECT COALESCE(MAX(file_id), 0) FROM files")
+                last_file_id = cur.fetchone()[0]
             cur.executemany(
                 """INSERT INTO files
                 (scan_run_id, path_abs, dir, name, ext, size_bytes, mtime_utc, ctime_utc,
@@ -207,6 +211,8 @@ def scan_root(root: str, cfg: CatalogConfig, progress_cb: Optional[ProgressCallb
                     for r in rows
                 ]
             )
+            if fts:
+                index_new_files(con, last_file_id)
             con.commit()
 
         def flush_batch() -> None:
@@ -1,7 +1,13 @@
 from __future__ import annotations
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 import hashlib
-from typing import Any
+import mmap
+import os
+import sys
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 
 _xxhash: Any
 try:
@@ -11,41 +17,464 @@ except Exception:
 
 xxhash: Any = _xxhash
 
-def quick_hash(path: Path, head_tail_bytes: int = 65536) -> str:
-    size = path.stat().st_size
-    h = xxhash.xxh64() if xxhash else hashlib.sha1()
-    h.update(str(size).encode())
+# Constructor for the quick-hash digest, resolved once rather than per file
+new_quick_hasher: Callable[[], Any] = xxhash.xxh64 if xxhash is not None else hashlib.sha1
+
+# Fast non-cryptographic hash for progressive head/tail samples: xxh3 where the
+# xxhash build has it, then xxh64, then stdlib blake2b. SAMPLE_HASH_NAME is
+# persisted next to h1/h2 so samples from a different algorithm are not reused.
+# Each yields an unsigned 64-bit integer so samples can live in INTEGER columns.
+_sample_uint: Callable[[Any], int]
+if xxhash is not None and hasattr(xxhash, "xxh3_64"):
+    SAMPLE_HASH_NAME = "xxh3_64"
+    _sample_uint = getattr(xxhash, "xxh3_64_intdigest", None) or (lambda data: xxhash.xxh3_64(data).intdigest())
+elif xxhash is not None:
+    SAMPLE_HASH_NAME = "xxh64"
+    _sample_uint = getattr(xxhash, "xxh64_intdigest", None) or (lambda data: xxhash.xxh64(data).intdigest())
+else:
+    SAMPLE_HASH_NAME = "blake2b"
+
+    def _sample_uint(data: Any) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+class _CryptographySha256:
+    """hashlib-style adapter over ``cryptography``'s OpenSSL SHA-256 context."""
+
+    __slots__ = ("_ctx",)
+
+    def __init__(self) -> None:
+        self._ctx = _crypto_hashes.Hash(_crypto_hashes.SHA256())
+
+    def update(self, data: Any) -> None:
+        self._ctx.update(data)
+
+    def hexdigest(self) -> str:
+        return self._ctx.finalize().hex()
+
+
+def _resolve_sha256() -> Callable[[], Any]:
+    # CPython's hashlib is normally backed by OpenSSL, which dispatches to the
+    # SHA-NI / ARMv8 crypto instructions on its own. Builds without OpenSSL
+    # fall back to a portable C implementation, so route through the
+    # ``cryptography`` package's OpenSSL instead when it is installed.
+    if getattr(hashlib.sha256, "__name__", "").startswith("openssl_"):
+        return hashlib.sha256
+    if _crypto_hashes is not None:
+        return _CryptographySha256
+    return hashlib.sha256
+
+
+_crypto_hashes: Any
+try:
+    from cryptography.hazmat.primitives import hashes as _crypto_hashes
+except Exception:
+    _crypto_hashes = None
+
+# Constructor for full-file SHA-256 hashers, resolved once per process
+new_sha256: Callable[[], Any] = _resolve_sha256()
+
+
+def to_int64(value: int) -> int:
+    """Reinterpret an unsigned 64-bit value as the signed integer SQLite stores."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+_preadv = getattr(os, "preadv", None)
+_fadvise = getattr(os, "posix_fadvise", None)
+
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_CLOEXEC", 0)
+# Linux only; skips the atime write-back every hashed file would otherwise cost
+_O_NOATIME = getattr(os, "O_NOATIME", 0)
+
+# Per-thread scratch buffer reused by the head/tail readers, so hashing
+# workers do not allocate a fresh bytes object for every sample they read
+_scratch_local = threading.local()
+
+# Below this size BLAKE3's thread pool and mmap setup cost more than they save
+BLAKE3_THREADED_MIN_BYTES = 1024 * 1024
+
+# SHA-256 and BLAKE3 both consume input in 64-byte blocks
+HASH_BLOCK_BYTES = 64
+
+
+def align_chunk_size(size: int, block: int = HASH_BLOCK_BYTES) -> int:
+    """Round a streaming chunk size up to a whole number of hash blocks.
+
+    Block-aligned chunks let the hasher consume every ``update()`` call
+    directly instead of buffering a partial trailing block between calls.
+    """
+    size = max(int(size), block)
+    return -(-size // block) * block
+
+def sample_tag(sample_bytes: int) -> str:
+    """Identify the algorithm and sample size behind persisted h1/h2 values."""
+    return f"{SAMPLE_HASH_NAME}:{int(sample_bytes)}"
+
+
+# Sorts after every character a path can contain, so [p, p + _PREFIX_END)
+# covers exactly the strings that start with p
+_PREFIX_END = "\U0010ffff"
+
+
+@lru_cache(maxsize=64)
+def compile_path_filter(
+    include_prefixes: Tuple[str, ...],
+    exclude_prefixes: Tuple[str, ...],
+    alias: str = "f",
+) -> Tuple[str, Tuple[str, ...]]:
+    """Compile include/exclude path prefixes into a SQL WHERE fragment.
+
+    Returns ``(sql, params)``; the fragment is empty or starts with ``AND``.
+    Each prefix becomes a half-open range test rather than ``LIKE 'p%'``:
+    two string comparisons per row instead of pattern matching, and ``_``
+    or ``%`` in a path no longer act as wildcards. NOCASE keeps the ASCII
+    case-insensitive matching LIKE had, which Windows paths rely on.
+    Results are cached, so every stage of a run reuses the same text.
+    """
+    clauses: List[str] = []
+    params: List[str] = []
+    col = f"{alias}.path_abs"
+
+    def ranges(prefixes: Tuple[str, ...]) -> str:
+        ors = []
+        for prefix in prefixes:
+            start = prefix.rstrip('\\/')
+            ors.append(f"({col} >= ? COLLATE NOCASE AND {col} < ? COLLATE NOCASE)")
+            params.extend((start, start + _PREFIX_END))
+        return ' OR '.join(ors)
+
+    if include_prefixes:
+        clauses.append('(' + ranges(include_prefixes) + ')')
+
+    if exclude_prefixes:
+        clauses.append('NOT (' + ranges(exclude_prefixes) + ')')
+
+    if clauses:
+        return ' AND ' + ' AND '.join(clauses) + ' ', tuple(params)
+    return '', ()
+
+
+def open_for_hashing(path: Path) -> Any:
+    """Open ``path`` as an unbuffered binary file for the hashing readers.
+
+    Adds O_NOATIME where the platform has it, retrying without it for files
+    the current user does not own (the kernel refuses the flag there).
+    """
+    fd = -1
+    if _O_NOATIME:
+        try:
+            fd = os.open(path, _OPEN_FLAGS | _O_NOATIME)
+        except PermissionError:
+            fd = -1
+    if fd < 0:
+        fd = os.open(path, _OPEN_FLAGS)
+    return open(fd, "rb", buffering=0)
+
+
+def prewarm(paths: Iterable[tuple[str, int]], head_tail_bytes: int = 0) -> None:
+    """Ask the kernel to start reading ``paths`` into the page cache.
+
+    ``paths`` yields ``(path, size)`` pairs. With ``head_tail_bytes`` set only
+    the head and tail ranges a quick hash reads are requested; otherwise the
+    whole file is. Purely advisory: a no-op where posix_fadvise is missing
+    (Windows), and files that fail to open are skipped.
+    """
+    if _fadvise is None:
+        return
+    willneed = os.POSIX_FADV_WILLNEED
+    n = int(head_tail_bytes)
+    for path, size in paths:
+        try:
+            fd = os.open(path, _OPEN_FLAGS)
+        except OSError:
+            continue
+        try:
+            if n <= 0 or size <= 2 * n:
+                _fadvise(fd, 0, 0, willneed)
+            else:
+                _fadvise(fd, 0, n, willneed)
+                _fadvise(fd, size - n, n, willneed)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _scratch(size: int) -> bytearray:
+    buf = getattr(_scratch_local, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = bytearray(size)
+        _scratch_local.buf = buf
+    return buf
+
+
+def readinto_at(f: Any, view: memoryview, offset: int) -> int:
+    """Fill ``view`` with bytes at ``offset`` from an open binary file.
+
+    Uses a single positional read where the platform has one (POSIX) and
+    falls back to seek+readinto on Windows. Returns the number of bytes read.
+    """
+    if _preadv is not None:
+        return _preadv(f.fileno(), [view], offset)
+    f.seek(offset)
+    return f.readinto(view) or 0
+
+
+def sample_hash(path: Path, size: int, offset: int = 0) -> tuple[int, int]:
+    """Hash ``size`` bytes of ``path`` starting at ``offset``.
+
+    Returns the digest as a signed 64-bit integer and the number of bytes
+    actually read.
+    """
+    with open_for_hashing(path) as f, memoryview(_scratch(size))[:size] as view:
+        nread = readinto_at(f, view, offset)
+        with view[:nread] as data:
+            return to_int64(_sample_uint(data)), nread
+
+
+def sample_hash_pair(path: Path, size: int, file_size: int) -> tuple[int, int, int]:
+    """Hash the head and tail samples of ``path`` from a single open.
+
+    Produces the same values as ``sample_hash`` on the first ``size`` bytes
+    and on the last ``min(size, file_size)`` bytes. When the whole file fits
+    in one sample, the head read doubles as the tail. Returns
+    ``(head, tail, bytes_read)``.
+    """
+    tail_len = min(size, max(0, file_size))
+    with open_for_hashing(path) as f, memoryview(_scratch(size))[:size] as view:
+        nread = readinto_at(f, view, 0)
+        with view[:nread] as data:
+            head = to_int64(_sample_uint(data))
+        if tail_len == 0:
+            return head, 0, nread
+        if tail_len == file_size and nread == file_size:
+            return head, head, nread
+        with view[:tail_len] as tail_view:
+            got = readinto_at(f, tail_view, file_size - tail_len)
+        with view[:got] as data:
+            tail = to_int64(_sample_uint(data))
+        return head, tail, nread + got
+
+
+def _advise(fd: int, advice_name: str) -> None:
+    if _fadvise is None:
+        return
+    try:
+        _fadvise(fd, 0, 0, getattr(os, advice_name))
+    except OSError:
+        pass
+
+
+def _advise_sequential(fd: int) -> None:
+    # Doubles the kernel readahead window for the whole-file passes
+    _advise(fd, "POSIX_FADV_SEQUENTIAL")
+
+
+def _advise_dontneed(fd: int) -> None:
+    # A fully hashed file is not read again; release its cached pages so
+    # long runs do not evict SQLite's hot pages
+    _advise(fd, "POSIX_FADV_DONTNEED")
+
+
+# Filesystems whose files another host can truncate or replace while they are
+# mapped; touching a vanished page then raises SIGBUS and kills the process
+_REMOTE_FS_TYPES = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph",
+    "glusterfs", "lustre", "gpfs", "davfs", "fuse.sshfs", "fuse.rclone", "fuse.s3fs",
+})
+_DRIVE_REMOTE = 4  # GetDriveTypeW result for mapped network drives
+
+
+@lru_cache(maxsize=1)
+def _linux_mounts() -> Tuple[Tuple[str, str], ...]:
+    """(mount point, filesystem type) pairs, longest mount point first."""
+    try:
+        with open("/proc/self/mounts", encoding="utf-8", errors="replace") as f:
+            fields = [line.split() for line in f]
+    except OSError:
+        return ()
+    mounts = [
+        (row[1].replace("\\040", " ").rstrip("/") + "/", row[2])
+        for row in fields
+        if len(row) >= 3
+    ]
+    mounts.sort(key=lambda m: len(m[0]), reverse=True)
+    return tuple(mounts)
+
+
+@lru_cache(maxsize=64)
+def _windows_drive_is_local(drive: str) -> bool:
+    try:
+        import ctypes
+        return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") != _DRIVE_REMOTE  # type: ignore[attr-defined]
+    except Exception:
+        return False
+
+
+def is_local_path(path: Any) -> bool:
+    """Return True when ``path`` is on a local disk, where mapping it is safe.
+
+    UNC paths, mapped network drives and network mounts (NFS, SMB, ...) are
+    not local; neither is anything on a platform this cannot tell.
+    """
+    p = os.path.abspath(os.fspath(path))
+    if sys.platform == "win32":
+        if p.startswith("\\\\?\\") and not p.upper().startswith("\\\\?\\UNC\\"):
+            p = p[4:]
+        drive = os.path.splitdrive(p)[0]
+        if len(drive) != 2:  # UNC share or no drive letter
+            return False
+        return _windows_drive_is_local(drive.upper())
+    if sys.platform.startswith("linux"):
+        p = p.rstrip("/") + "/"
+        for mount_point, fs_type in _linux_mounts():
+            if p.startswith(mount_point):
+                return fs_type not in _REMOTE_FS_TYPES
+    return False
+
+
+def _map_readonly(f: Any) -> Optional[mmap.mmap]:
+    """Map an open file read-only, or return None for empty/unmappable files."""
+    try:
+        size = os.fstat(f.fileno()).st_size
+        # A 32-bit process cannot map files past its address space
+        if size == 0 or size > sys.maxsize:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, OverflowError):
+        # Some network filesystems refuse mappings; callers fall back to read()
+        return None
+    advice = getattr(mmap, "MADV_SEQUENTIAL", None)
+    if advice is not None:
+        try:
+            mm.madvise(advice)
+        except (AttributeError, OSError):
+            pass
+    return mm
+
+
+@contextmanager
+def mapped_file(path: Path, use_mmap: bool = True) -> Iterator[memoryview]:
+    """Yield a read-only memoryview over the whole file.
+
+    Only local files are mapped (and only with ``use_mmap``); others are
+    read into memory instead, so this is meant for small files. Slices taken
+    from the view must be released before the block exits.
+    """
+    with open_for_hashing(path) as f:
+        mm = _map_readonly(f) if use_mmap and is_local_path(path) else None
+        if mm is None:
+            view = memoryview(f.read())
+            try:
+                yield view
+            finally:
+                view.release()
+            return
+        with mm:
+            view = memoryview(mm)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def feed_file(
+    hasher: Any,
+    path: Path,
+    span: int = 0,
+    on_span: Optional[Callable[[int], Any]] = None,
+    chunk_size: int = 1024 * 1024,
+    use_mmap: bool = True,
+) -> int:
+    """Feed a whole file into ``hasher`` without copying it through Python.
+
+    Local files are memory-mapped (unless ``use_mmap`` is False) and passed
+    to ``hasher.update()`` as zero-copy memoryview slices of ``span`` bytes
+    (or as one buffer when ``span`` is 0), calling ``on_span(n)`` after each
+    slice so callers can throttle. Network files and files that cannot be
+    mapped are streamed with ``readinto`` into one reused buffer instead, so
+    a file truncated by another host fails the read rather than the process.
+    Returns the number of bytes hashed.
+    """
+    with open_for_hashing(path) as f:
+        _advise_sequential(f.fileno())
+        try:
+            mm = _map_readonly(f) if use_mmap and is_local_path(path) else None
+            if mm is None:
+                total = 0
+                with memoryview(bytearray(span or chunk_size)) as buf:
+                    while True:
+                        n = f.readinto(buf)
+                        if not n:
+                            break
+                        with buf[:n] as chunk:
+                            hasher.update(chunk)
+                        total += n
+                        if on_span:
+                            on_span(n)
+                return total
+            with mm:
+                size = len(mm)
+                step = span if span > 0 else size
+                view = memoryview(mm)
+                try:
+                    for off in range(0, size, step):
+                        with view[off:off + step] as piece:
+                            hasher.update(piece)
+                            n = len(piece)
+                        if on_span:
+                            on_span(n)
+                finally:
+                    view.release()
+                return size
+        finally:
+            # Runs after the mapping is closed; mapped pages cannot be dropped
+            _advise_dontneed(f.fileno())
+
+def quick_hash(
+    path: Path,
+    head_tail_bytes: int = 65536,
+    on_read: Optional[Callable[[int], Any]] = None,
+) -> str:
+    """Hash the file size plus its first and last ``head_tail_bytes`` bytes.
+
+    The file is opened once and sized with fstat; head and tail are fetched
+    with positional reads so no seek state is involved. ``on_read(n)`` is
+    called after each read, which lets callers apply a bandwidth limiter.
+    """
     n = head_tail_bytes
-    # Use buffered I/O for better throughput on Windows/network shares
-    with open(path, "rb") as f:
-        head = f.read(n)
-        if head:
-            h.update(head)
+    with open_for_hashing(path) as f, memoryview(_scratch(n))[:n] as view:
+        size = os.fstat(f.fileno()).st_size
+        h = new_quick_hasher()
+        h.update(str(size).encode())
+        got = readinto_at(f, view, 0)
+        if got:
+            if on_read:
+                on_read(got)
+            with view[:got] as head:
+                h.update(head)
         if size > n:
-            try:
-                f.seek(max(0, size - n))
-            except OSError:
-                pass
-            tail = f.read(n)
-            if tail:
-                h.update(tail)
+            got = readinto_at(f, view, max(0, size - n))
+            if got:
+                if on_read:
+                    on_read(got)
+                with view[:got] as tail:
+                    h.update(tail)
     return h.hexdigest()
 
-def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
-    h = hashlib.sha256()
-    # Buffered I/O tends to perform better across platforms
-    with open(path, "rb") as f:
-        while True:
-            b = f.read(chunk_size)
-            if not b:
-                break
-            h.update(b)
+def sha256_file(path: Path, chunk_size: int = 1024 * 1024, use_mmap: bool = True) -> str:
+    h = new_sha256()
+    # One update over the mapping; hashlib drops the GIL for large buffers
+    feed_file(h, path, chunk_size=chunk_size, use_mmap=use_mmap)
     return h.hexdigest()
 
 
-def blake3_file(path: Path, chunk_size: int = 2 * 1024 * 1024) -> str:
+def blake3_file(path: Path, chunk_size: int = 2 * 1024 * 1024, use_mmap: bool = True, threads: int = 0) -> str:
     """Compute the BLAKE3 digest for a file.
 
+    Files of BLAKE3_THREADED_MIN_BYTES or more are hashed with up to
+    ``threads`` threads; 0 lets BLAKE3 use one per CPU.
+
     Falls back to SHA256 if the blake3 module is unavailable.
     """
     try:
@@ -54,11 +483,17 @@ def blake3_file(path: Path, chunk_size: int = 2 * 1024 * 1024) -> str:
         # Defer import error until the function is actually used elsewhere
         raise RuntimeError("The 'blake3' package is not installed. Install it with 'pip install blake3'.")
 
-    hasher = blake3.blake3()
-    with open(path, "rb") as f:
-        while True:
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
-            hasher.update(chunk)
+    size = path.stat().st_size
+    if size >= BLAKE3_THREADED_MIN_BYTES:
+        # Let BLAKE3 walk the whole file with its SIMD tree and thread pool
+        hasher = blake3.blake3(max_threads=threads if threads > 0 else blake3.blake3.AUTO)
+        update_mmap = getattr(hasher, "update_mmap", None)
+        if update_mmap is not None and use_mmap and is_local_path(path):
+            update_mmap(os.fspath(path))
+            with open_for_hashing(path) as f:
+                _advise_dontneed(f.fileno())
+            return hasher.hexdigest()
+    else:
+        hasher = blake3.blake3()
+    feed_file(hasher, path, chunk_size=chunk_size, use_mmap=use_mmap)
     return hasher.hexdigest()
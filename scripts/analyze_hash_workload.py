@@ -2,7 +2,8 @@
 Analyze how much data needs to be hashed (i.e., downloaded from network drive).
 Shows total bytes that need to be read for duplicate detection.
 """
-from catalog.db import connect
+from catalog.db import connect, migrate
+from catalog.dedupe import content_hash_column
 from pathlib import Path
 
 def format_bytes(size):
@@ -19,15 +20,17 @@ def format_bytes(size):
 def main():
     db_path = Path('data/projects.db')
     con = connect(db_path)
+    migrate(con)
     cur = con.cursor()
+    hash_col = content_hash_column(None, con)
     
     print("=" * 100)
     print("HASH WORKLOAD ANALYSIS")
     print("=" * 100)
     print()
     
-    # Files needing hashing (sha256 IS NULL)
-    cur.execute("""
+    # Files needing hashing (no digest in the content hash column yet)
+    cur.execute(f"""
         SELECT 
             COUNT(*) as file_count,
             SUM(size_bytes) as total_bytes,
@@ -36,7 +39,7 @@ def main():
             MAX(size_bytes) as max_bytes
         FROM files
         WHERE state NOT IN ('error', 'missing')
-          AND sha256 IS NULL
+          AND {hash_col} IS NULL
           AND path_abs LIKE 'S:%'
     """)
     
@@ -56,7 +59,7 @@ def main():
     print()
     
     # Files in duplicate groups (size + ext matches)
-    cur.execute("""
+    cur.execute(f"""
         WITH dup_groups AS (
             SELECT size_bytes, COALESCE(ext, '') AS ext
             FROM files
@@ -76,7 +79,7 @@ def main():
           AND COALESCE(f.ext, '') = dg.ext
         WHERE f.state NOT IN ('error', 'missing')
           AND f.path_abs LIKE 'S:%'
-          AND f.sha256 IS NULL
+          AND f.{hash_col} IS NULL
     """)
     
     row = cur.fetchone()
@@ -105,21 +108,21 @@ def main():
     
     for label, min_size, max_size in size_ranges:
         if max_size == float('inf'):
-            cur.execute("""
+            cur.execute(f"""
                 SELECT COUNT(*), SUM(size_bytes)
                 FROM files
                 WHERE state NOT IN ('error', 'missing')
                   AND path_abs LIKE 'S:%'
-                  AND sha256 IS NULL
+                  AND {hash_col} IS NULL
                   AND size_bytes >= ?
             """, (min_size,))
         else:
-            cur.execute("""
+            cur.execute(f"""
                 SELECT COUNT(*), SUM(size_bytes)
                 FROM files
                 WHERE state NOT IN ('error', 'missing')
                   AND path_abs LIKE 'S:%'
-                  AND sha256 IS NULL
+                  AND {hash_col} IS NULL
                   AND size_bytes >= ?
                   AND size_bytes < ?
             """, (min_size, max_size))
@@ -163,12 +166,12 @@ def main():
     print()
     
     # Calculate what progressive mode would save
-    cur.execute("""
+    cur.execute(f"""
         SELECT COUNT(*), SUM(size_bytes)
         FROM files
         WHERE state NOT IN ('error', 'missing')
           AND path_abs LIKE 'S:%'
-          AND sha256 IS NULL
+          AND {hash_col} IS NULL
           AND size_bytes > 1048576
     """)
     
@@ -1,12 +1,19 @@
-from catalog.db import connect
+from catalog.db import connect, migrate
+from catalog.dedupe import content_hash_column
 from pathlib import Path
 
 con = connect(Path('data/projects.db'))
+migrate(con)
 cur = con.cursor()
 
 cur.execute('SELECT COUNT(*) FROM files WHERE sha256 IS NOT NULL')
 print(f'Files with SHA256: {cur.fetchone()[0]:,}')
 
+cur.execute('SELECT COUNT(*) FROM files WHERE blake3 IS NOT NULL')
+print(f'Files with BLAKE3: {cur.fetchone()[0]:,}')
+
+hash_col = content_hash_column(None, con)
+
 cur.execute('SELECT COUNT(*) FROM files WHERE state = "done"')
 print(f'Files marked done: {cur.fetchone()[0]:,}')
 
@@ -18,19 +25,19 @@ print('\nFile states:')
 for row in cur.fetchall():
     print(f'  {row[0] or "(null)"}: {row[1]:,}')
 
-cur.execute('''
-    SELECT COUNT(*) as dup_count, COUNT(DISTINCT sha256) as unique_hashes
+cur.execute(f'''
+    SELECT COALESCE(SUM(cnt), 0) as dup_count, COUNT(*) as unique_hashes
     FROM (
-        SELECT sha256
+        SELECT COUNT(*) AS cnt
         FROM files
-        WHERE sha256 IS NOT NULL
-        GROUP BY sha256
+        WHERE {hash_col} IS NOT NULL
+        GROUP BY {hash_col}
         HAVING COUNT(*) > 1
     )
 ''')
 row = cur.fetchone()
 print(f'\nDuplicate analysis:')
-print(f'  Files with duplicate SHA256: {row[0]:,}')
+print(f'  Files with duplicate {hash_col.upper()}: {row[0]:,}')
 print(f'  Unique duplicate hashes: {row[1]:,}')
 
 con.close()